@@ -0,0 +1,448 @@
+"""
+Seeded benchmark suite for the engine, the searches and game simulation.
+
+The suite measures, for every board size:
+    engine      Mancala.play_turn, AIPlayer.result, AIPlayer.actions and AIPlayer.terminal_test calls/s
+    search      nodes and time of minmax_decision and alpha_beta_cutoff_search on fixed positions
+    simulation  games/s of random vs random (Mancala and BatchSimulator) and random vs alpha-beta
+Results are written as JSON. With --baseline the run is compared to an earlier results file
+and every metric that got worse by more than --threshold plus its measured noise (at most
+NOISE_CAP) is flagged (exit code 1). Every timing is the median of several runs of at least
+MIN_TIME seconds each.
+
+--compare instead runs the feature comparisons: the compact MancalaEngine against the old
+dictionary protocol (LegacyAIPlayer below, kept only for this), the TranspositionTable,
+MoveOrdering, pvs search and ParallelSearch scaling.
+
+Usage: python benchmark.py [--boards 6x4 6x5 4x3] [--output results.json] [--baseline old.json]
+       python benchmark.py --compare [--depth 6]
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import random
+import statistics
+import sys
+import time
+from main import (Mancala, AIPlayer, MoveOrdering, ParallelSearch, SearchStats, TranspositionTable,
+                  alpha_beta_cutoff_search, iterative_deepening_search, minmax_decision)
+
+
+class LegacyAIPlayer(AIPlayer):
+    """The original per-node Mancala construction with {'board', 'currentPlayer'} states."""
+    def getState(self):
+        return {'board': self.board[:], 'currentPlayer': self.current_player}
+
+    def actions(self, state):
+        board = state['board']
+        start, end = self.p1_pits_index if state['currentPlayer'] == 1 else self.p2_pits_index
+        return [pit - start + 1 for pit in range(start, end + 1) if board[pit] > 0]
+
+    def result(self, state, move):
+        game = Mancala(self.pits_per_player, 0)
+        game.board = state['board'][:]
+        game.current_player = state['currentPlayer']
+        game.play_turn(move)
+        return {'board': game.board, 'currentPlayer': game.current_player}
+
+    def utility(self, state, player):
+        board = state['board']
+        if player == 1:
+            return board[self.p1_mancala_index] - board[self.p2_mancala_index]
+        return board[self.p2_mancala_index] - board[self.p1_mancala_index]
+
+    def terminal_test(self, state):
+        board = state['board']
+        p1_start, p1_end = self.p1_pits_index
+        p2_start, p2_end = self.p2_pits_index
+        return not any(board[p1_start:p1_end + 1]) or not any(board[p2_start:p2_end + 1])
+
+    def to_move(self, state):
+        return state['currentPlayer']
+
+
+def count_nodes(game):
+    """Wrap game.result so every generated node is counted."""
+    counter = [0]
+    result = game.result
+
+    def counted_result(state, move):
+        counter[0] += 1
+        return result(state, move)
+    game.result = counted_result
+    return counter
+
+
+def run(game, search, depth):
+    counter = count_nodes(game)
+    state = game.getState()
+    start = time.perf_counter()
+    action = search(state, game, depth)
+    elapsed = time.perf_counter() - start
+    return action, counter[0], elapsed
+
+
+def play_game(depth, table, seed=109):
+    """Random player 1 against alpha-beta player 2; returns the nodes searched per AI move."""
+    rng = random.Random(seed)
+    game = AIPlayer(6, 4)
+    counter = count_nodes(game)
+    state = game.getState()
+    nodes = []
+    while not game.terminal_test(state):
+        if game.to_move(state) == 1:
+            move = rng.choice(game.actions(state))
+        else:
+            before = counter[0]
+            move = alpha_beta_cutoff_search(state, game, depth, None, None, table)
+            nodes.append(counter[0] - before)
+        state = game.result(state, move)
+    return nodes
+
+
+def sample_positions(count, seed=109, pits=6, stones=4):
+    """Positions reached by random play, used as a fixed search workload."""
+    rng = random.Random(seed)
+    game = AIPlayer(pits, stones)
+    positions = []
+    state = game.getState()
+    while len(positions) < count:
+        if game.terminal_test(state):
+            state = game.getState()
+        positions.append(state)
+        state = game.result(state, rng.choice(game.actions(state)))
+    return game, positions
+
+
+def move_ordering(depth, positions=20):
+    game, states = sample_positions(positions)
+    states = [state for state in states if not game.terminal_test(state)]
+    print(f"move ordering over {len(states)} positions (depth {depth})")
+    scores = None
+    for label, use_ordering in (("off", False), ("on", True)):
+        game = AIPlayer(6, 4)
+        ordering = MoveOrdering(game) if use_ordering else None
+        counter = count_nodes(game)
+        start = time.perf_counter()
+        results = [alpha_beta_cutoff_search(state, game, depth, with_score=True, ordering=ordering)[1] for state in states]
+        elapsed = time.perf_counter() - start
+        same = "" if scores is None or scores == results else " DIFFERENT SCORES"
+        scores = results
+        print(f"  ordering {label:3} nodes={counter[0]} time={elapsed:.3f}s{same}")
+
+
+def pvs_search(depth, positions=20):
+    game, states = sample_positions(positions)
+    states = [state for state in states if not game.terminal_test(state)]
+    print(f"pvs over {len(states)} positions (depth {depth}, and iterative deepening to depth {depth + 3})")
+    results = None
+    id_results = None
+    for label, pvs in (("off", False), ("on", True)):
+        stats = SearchStats()
+        start = time.perf_counter()
+        scores = [alpha_beta_cutoff_search(state, game, depth, table=TranspositionTable(), with_score=True, ordering=MoveOrdering(game),
+                                           stats=stats, pvs=pvs) for state in states]
+        elapsed = time.perf_counter() - start
+        id_stats = SearchStats()
+        moves = [iterative_deepening_search(state, game, 10 ** 9, depth + 3, stats=id_stats, pvs=pvs) for state in states]
+        same = "" if results is None or results == scores else " DIFFERENT RESULTS"
+        id_same = "" if id_results is None or id_results == moves else " DIFFERENT MOVES"
+        results = scores
+        id_results = moves
+        print(f"  pvs {label:3} nodes={stats.nodes} time={elapsed:.3f}s{same} "
+              f"iterative deepening nodes={id_stats.nodes} time={id_stats.time:.3f}s{id_same}")
+
+
+def parallel_scaling(depth, positions=8):
+    game, states = sample_positions(positions)
+    start = time.perf_counter()
+    serial = [alpha_beta_cutoff_search(state, game, depth) for state in states]
+    serial_time = time.perf_counter() - start
+    print(f"parallel root split over {positions} positions (depth {depth})")
+    print(f"  serial    time={serial_time:.3f}s")
+    workers = 1
+    while workers <= multiprocessing.cpu_count():
+        with ParallelSearch(workers) as searcher:
+            start = time.perf_counter()
+            moves = [searcher.search(state, game, depth) for state in states]
+            elapsed = time.perf_counter() - start
+        same = "same moves" if moves == serial else "DIFFERENT MOVES"
+        print(f"  workers={workers:<3} time={elapsed:.3f}s speedup={serial_time / elapsed:.2f}x {same}")
+        workers *= 2
+
+
+def random_games(pits, stones, games, seed):
+    """Move lists of seeded random games."""
+    rng = random.Random(seed)
+    game = AIPlayer(pits, stones)
+    move_lists = []
+    for _ in range(games):
+        state = game.getState()
+        moves = []
+        while not game.terminal_test(state):
+            move = rng.choice(game.actions(state))
+            moves.append(move)
+            state = game.result(state, move)
+        move_lists.append(moves)
+    return move_lists
+
+
+MIN_TIME = 0.2 # seconds every timed run lasts at least; short workloads are repeated until they do
+RUNS = 7 # timed runs per metric, the median is reported
+NOISE_FACTOR = 1 # compare allows this many times the combined noise of both runs on top of --threshold
+NOISE_CAP = 0.05 # but never more than this, so a noisy machine cannot hide a real slowdown
+
+
+class Timing:
+    """A timed workload: fn is called calls times per run (calls None reports seconds per fn call)."""
+    def __init__(self, fn, calls, unit):
+        self.fn = fn
+        self.calls = calls
+        self.unit = unit
+        self.loops = 1
+        self.times = []
+
+    def calibrate(self):
+        """Repeats fn often enough for a run to last MIN_TIME."""
+        start = time.perf_counter()
+        self.fn()
+        once = time.perf_counter() - start
+        self.loops = max(1, math.ceil(MIN_TIME / max(once, 1e-6)))
+
+    def run(self):
+        fn = self.fn
+        start = time.perf_counter()
+        for _ in range(self.loops):
+            fn()
+        self.times.append((time.perf_counter() - start) / self.loops)
+
+    def metric(self):
+        """The median run as a metric, with the median relative deviation of the runs as its noise."""
+        seconds = statistics.median(self.times)
+        noise = statistics.median(abs(t - seconds) for t in self.times) / seconds
+        if self.calls is None:
+            return {'value': seconds, 'unit': self.unit, 'higher_is_better': False, 'noise': noise, 'timed': True}
+        return {'value': self.calls / seconds, 'unit': self.unit, 'higher_is_better': True, 'noise': noise, 'timed': True}
+
+
+def reference():
+    """Fixed pure Python work that does not depend on the code under test: its time tells how fast
+    the machine was during a run, so compare can take out the speed of the machine itself."""
+    board = list(range(14))
+    total = 0
+    for i in range(20000):
+        pit = i % 14
+        board[pit] += 1
+        total += board[pit] * 3 % 7
+    return total
+
+
+def rate(calls, fn, unit='calls/s'):
+    return Timing(fn, calls, unit)
+
+
+def duration(fn):
+    return Timing(fn, None, 's')
+
+
+def measure(metrics):
+    """Replaces every Timing in metrics by its metric. The runs go round robin over all the
+    timings, so a slow period of the machine shifts a few runs of every metric, not the median
+    of a few metrics."""
+    timings = [metric for metric in metrics.values() if isinstance(metric, Timing)]
+    for timing in timings:
+        timing.calibrate()
+    for _ in range(RUNS):
+        for timing in timings:
+            timing.run()
+    return {key: metric.metric() if isinstance(metric, Timing) else metric for key, metric in metrics.items()}
+
+
+def engine_metrics(pits, stones, seed):
+    move_lists = random_games(pits, stones, 200, seed)
+    calls = sum(len(moves) for moves in move_lists)
+    game = AIPlayer(pits, stones)
+    states = []
+    for moves in move_lists:
+        state = game.getState()
+        for move in moves:
+            state = game.result(state, move)
+            states.append(state)
+
+    def play_turns():
+        for moves in move_lists:
+            board = Mancala(pits, stones)
+            for move in moves:
+                board.play_turn(move)
+
+    def results():
+        for moves in move_lists:
+            state = game.getState()
+            for move in moves:
+                state = game.result(state, move)
+
+    def actions():
+        for state in states:
+            game.actions(state)
+
+    def terminal_tests():
+        for state in states:
+            game.terminal_test(state)
+
+    return {'play_turn': rate(calls, play_turns),
+            'result': rate(calls, results),
+            'actions': rate(len(states), actions),
+            'terminal_test': rate(len(states), terminal_tests)}
+
+
+def search_metrics(pits, stones, seed, depth, positions=5):
+    game, states = sample_positions(positions * 3, seed, pits, stones)
+    states = [state for state in states if not game.terminal_test(state)][::3][:positions]
+    metrics = {}
+    for name, search, d in (("minmax", minmax_decision, max(depth - 3, 1)), ("alphabeta", alpha_beta_cutoff_search, depth)):
+        stats = SearchStats()
+        for state in states:
+            search(state, game, d, stats=stats)
+        metrics[f'{name}_d{d}_nodes'] = {'value': stats.nodes, 'unit': 'nodes', 'higher_is_better': False, 'noise': 0.0}
+        metrics[f'{name}_d{d}_time'] = duration(lambda search=search, d=d: [search(state, game, d) for state in states])
+    return metrics
+
+
+def simulation_metrics(pits, stones, seed, games=200, ai_games=3, ai_depth=3):
+    metrics = {}
+
+    def random_vs_random():
+        random.seed(seed)
+        for _ in range(games):
+            Mancala(pits, stones).play_random_verse_random()
+    metrics['random_vs_random'] = rate(games, random_vs_random, 'games/s')
+
+    try:
+        from simulator import BatchSimulator
+    except ImportError: # NumPy missing
+        BatchSimulator = None
+    if BatchSimulator is not None:
+        batch = 20 * games
+        sim = BatchSimulator(pits, stones)
+        metrics['batch_random_vs_random'] = rate(batch, lambda: sim.run(batch, seed=seed), 'games/s')
+
+    game = AIPlayer(pits, stones)
+
+    def random_vs_alphabeta():
+        rng = random.Random(seed)
+        for _ in range(ai_games):
+            state = game.getState()
+            table = TranspositionTable()
+            while not game.terminal_test(state):
+                if game.to_move(state) == 1:
+                    move = rng.choice(game.actions(state))
+                else:
+                    move = alpha_beta_cutoff_search(state, game, ai_depth, None, None, table)
+                state = game.result(state, move)
+    metrics[f'random_vs_alphabeta_d{ai_depth}'] = rate(ai_games, random_vs_alphabeta, 'games/s')
+    return metrics
+
+
+def run_suite(boards, seed, depth):
+    results = {'meta': {'python': platform.python_version(), 'machine': platform.machine(), 'seed': seed,
+                        'depth': depth, 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}}
+    metrics = {}
+    for pits, stones in boards:
+        board = f'{pits}x{stones}'
+        for section, workloads in (('engine', engine_metrics(pits, stones, seed)),
+                                   ('search', search_metrics(pits, stones, seed, depth)),
+                                   ('simulation', simulation_metrics(pits, stones, seed))):
+            for name, metric in workloads.items():
+                metrics[f'{board}/{section}/{name}'] = metric
+    metrics['reference'] = duration(reference)
+    results['metrics'] = measure(metrics)
+    results['meta']['reference'] = results['metrics'].pop('reference')['value']
+    for key, metric in results['metrics'].items():
+        print(f"{key:45} {metric['value']:>14,.6g} {metric['unit']:8} noise {metric['noise']:.1%}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Prints the change of every metric against baseline and returns the regressed metric names.
+    A metric regresses when it got worse by more than threshold plus NOISE_FACTOR times the
+    combined noise of both runs (the root of the summed squares), at most NOISE_CAP. Timings are
+    first scaled by how much faster the machine ran the reference workload than for the baseline."""
+    speed = baseline['meta'].get('reference', 1.0) / results['meta'].get('reference', 1.0)
+    regressions = []
+    print(f"\ncompared to baseline from {baseline['meta'].get('time', '?')} (threshold {threshold:.0%} + noise), "
+          f"timings scaled by the machine speed {speed:.2f}x")
+    for key, metric in results['metrics'].items():
+        old = baseline['metrics'].get(key)
+        if old is None or not old['value']:
+            continue
+        scale = 1.0
+        if metric.get('timed'):
+            scale = speed if metric['higher_is_better'] else 1 / speed
+        change = metric['value'] / (old['value'] * scale) - 1
+        worse = -change if metric['higher_is_better'] else change
+        noise = math.hypot(metric.get('noise', 0.0), old.get('noise', 0.0))
+        allowed = threshold + min(NOISE_CAP, NOISE_FACTOR * noise)
+        flag = "REGRESSION" if worse > allowed else ""
+        if flag:
+            regressions.append(key)
+        print(f"{key:45} {change:+8.1%}  allowed {allowed:5.1%} {flag}")
+    return regressions
+
+
+def feature_comparisons(depth):
+    searches = [("alpha_beta_cutoff_search", alpha_beta_cutoff_search, depth),
+                ("minmax_decision", minmax_decision, max(depth - 2, 1))]
+    for name, search, d in searches:
+        print(f"{name} (depth {d})")
+        for label, game in (("before", LegacyAIPlayer(6, 4)), ("after", AIPlayer(6, 4))):
+            action, nodes, elapsed = run(game, search, d)
+            print(f"  {label:6} move={action} nodes={nodes} time={elapsed:.3f}s nodes/s={nodes / elapsed:,.0f}")
+
+    print(f"transposition table over one game (depth {depth})")
+    plain = play_game(depth, None)
+    table = TranspositionTable()
+    start = time.perf_counter()
+    cached = play_game(depth, table)
+    elapsed = time.perf_counter() - start
+    stats = table.stats()
+    print(f"  without table nodes={sum(plain)}")
+    print(f"  with table    nodes={sum(cached)} reduction={1 - sum(cached) / sum(plain):.1%} time={elapsed:.3f}s")
+    print(f"  probes={stats['probes']} hits={stats['hits']} misses={stats['misses']} "
+          f"hit_rate={stats['hit_rate']:.1%} cutoffs={stats['cutoffs']} entries={stats['entries']}")
+
+    move_ordering(depth)
+    pvs_search(depth)
+    parallel_scaling(depth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mancala benchmark suite")
+    parser.add_argument("--boards", nargs='+', default=['6x4', '6x5', '4x3'], help="pits_per_player x stones_per_pit")
+    parser.add_argument("--seed", type=int, default=109)
+    parser.add_argument("--depth", type=int, default=6, help="alpha-beta depth (minimax uses depth - 3)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed relative slowdown before a metric is flagged, on top of the measured noise")
+    parser.add_argument("--compare", action="store_true", help="run the feature comparisons instead of the suite")
+    args = parser.parse_args()
+
+    if args.compare:
+        feature_comparisons(args.depth)
+        return
+    boards = [tuple(int(x) for x in board.split('x')) for board in args.boards]
+    results = run_suite(boards, args.seed, args.depth)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Opening book for Mancala, generated offline.
+
+Searches every position reachable in the first --plies plies from the start of the game
+(all moves of both players) to --depth with alpha_beta_cutoff_search, and writes the best
+move of each to book_<pits>x<stones>.bin (see OpeningBook for the file format). The searches
+are spread over a process pool.
+
+Pass a book as book= to alpha_beta_cutoff_search or iterative_deepening_search and they answer
+the positions in it instantly. main(), the UI, server.py and the tournament agents load the
+book for their board size with OpeningBook.find.
+
+Usage: python book.py --pits 6 --stones 4 --plies 4 --depth 10
+"""
+import argparse
+import multiprocessing
+import os
+import struct
+import time
+from main import AIPlayer, MoveOrdering, TranspositionTable, alpha_beta_cutoff_search
+
+
+def _mix64(x):
+    """splitmix64 finalizer, gives well spread 64 bit keys that are the same on every run."""
+    x = (x + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
+
+
+class OpeningBook:
+    """
+    Best moves for the first plies of a game.
+
+    Positions are keyed by a stable 64 bit Zobrist style hash of the state (see position_hash),
+    so the file stays valid across runs. Each book belongs to one board size and the file name
+    and header both record it, so books for 6x4 and 6x5 can sit next to each other.
+    File format: header (magic, version, pits, stones, plies, depth, count) then count
+    (hash, move) records.
+    """
+    MAGIC = b'MANCBOOK'
+    VERSION = 2 # version 2 hashes the pit bitmask and stone total slots of the state too
+    HEADER = struct.Struct('<8sHHHHHI')
+    ENTRY = struct.Struct('<QB')
+
+    def __init__(self, pits_per_player, stones_per_pit, moves=None, plies=0, depth=0):
+        self.pits_per_player = pits_per_player
+        self.stones_per_pit = stones_per_pit
+        self.moves = moves if moves is not None else {}
+        self.plies = plies
+        self.depth = depth
+
+    @staticmethod
+    def filename(pits_per_player, stones_per_pit):
+        return f"book_{pits_per_player}x{stones_per_pit}.bin"
+
+    @staticmethod
+    def position_hash(state):
+        h = 0
+        for slot, count in enumerate(state):
+            h ^= _mix64((slot << 16) | count)
+        return h
+
+    def lookup(self, state):
+        return self.moves.get(self.position_hash(state))
+
+    def best_move(self, game, state):
+        """The book move for state, or None if the position is not in the book. A move that is
+        not legal in state (a hash collision) is never returned."""
+        move = self.lookup(state)
+        if move is not None and move in game.actions(state):
+            return move
+        return None
+
+    def add(self, state, move):
+        self.moves[self.position_hash(state)] = move
+
+    def save(self, path=None):
+        path = path or self.filename(self.pits_per_player, self.stones_per_pit)
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.pits_per_player, self.stones_per_pit,
+                                     self.plies, self.depth, len(self.moves)))
+            for key in sorted(self.moves):
+                f.write(self.ENTRY.pack(key, self.moves[key]))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, pits, stones, plies, depth, count = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"{path} is not a version {cls.VERSION} opening book")
+        moves = dict(cls.ENTRY.iter_unpack(data[cls.HEADER.size:cls.HEADER.size + count * cls.ENTRY.size]))
+        return cls(pits, stones, moves, plies, depth)
+
+    @classmethod
+    def find(cls, pits_per_player, stones_per_pit, directory='.'):
+        """Loads the book for this board size from directory, or returns None if there is none."""
+        path = os.path.join(directory, cls.filename(pits_per_player, stones_per_pit))
+        return cls.load(path) if os.path.exists(path) else None
+
+
+_game = None
+
+
+def _init_worker(pits, stones):
+    global _game
+    _game = AIPlayer(pits, stones)
+
+
+def _best_move(job):
+    state, depth = job
+    return state, alpha_beta_cutoff_search(state, _game, depth, None, None, TranspositionTable(), ordering=MoveOrdering(_game))
+
+
+def opening_positions(game, plies):
+    """Every distinct non-terminal position within plies moves of the start."""
+    frontier = [game.getState()]
+    seen = set(frontier)
+    positions = []
+    for _ in range(plies):
+        next_frontier = []
+        for state in frontier:
+            if game.terminal_test(state):
+                continue
+            positions.append(state)
+            for move in game.actions(state):
+                child = game.result(state, move)
+                if child not in seen:
+                    seen.add(child)
+                    next_frontier.append(child)
+        frontier = next_frontier
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a Mancala opening book")
+    parser.add_argument("--pits", type=int, default=6)
+    parser.add_argument("--stones", type=int, default=4)
+    parser.add_argument("--plies", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--output", default=None, help="defaults to book_<pits>x<stones>.bin")
+    args = parser.parse_args()
+
+    game = AIPlayer(args.pits, args.stones)
+    positions = opening_positions(game, args.plies)
+    print(f"Searching {len(positions)} positions to depth {args.depth}")
+    book = OpeningBook(args.pits, args.stones, plies=args.plies, depth=args.depth)
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(args.pits, args.stones)) as pool:
+        for i, (state, move) in enumerate(pool.imap_unordered(_best_move, [(state, args.depth) for state in positions]), 1):
+            book.add(state, move)
+            if i % 100 == 0:
+                print(f"  {i}/{len(positions)} positions, {time.perf_counter() - start:.1f}s")
+    path = book.save(args.output)
+    print(f"Wrote {len(book.moves)} moves to {path} in {time.perf_counter() - start:.1f}s")
+
+    loaded = OpeningBook.load(path)
+    state = game.getState()
+    lookups = 100000
+    start = time.perf_counter()
+    for _ in range(lookups):
+        loaded.lookup(state)
+    print(f"Lookup: {(time.perf_counter() - start) / lookups * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
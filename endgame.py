@@ -0,0 +1,236 @@
+"""
+Endgame database for Mancala, built offline by retrograde analysis.
+
+Once few stones are left in the pits, the rest of the game only depends on those pits and
+on who is to move; the stones already in the mancalas never move again. For every pit
+configuration with at most max_stones stones in play the database stores the exact number of
+stones the player to move will gain over the opponent from here on with perfect play.
+Positions are solved from 0 stones upwards, so every move that banks or captures a stone
+lands on an already solved configuration, and moves that keep the stone count are solved
+depth first within the level.
+
+File format: a 16 byte header (magic, version, pits_per_player, max_stones) followed by one
+signed byte per configuration, always seen from the player to move, in the order given by
+_Indexer. The file is memory-mapped, so loading is instant and only touched pages are read.
+
+main() and the UI load the largest database for their board size with EndgameDatabase.find.
+
+Usage: python endgame.py --pits 6 --stones 4 6 8
+"""
+import argparse
+import array
+import mmap
+import os
+import random
+import struct
+import time
+from main import MancalaEngine
+
+MAGIC = b'MANCEGDB'
+VERSION = 1
+HEADER = struct.Struct('<8sHHHxx')
+
+
+class _Indexer:
+    """Ranks pit configurations (2 * pits_per_player counts summing to at most max_stones) into 0..size-1."""
+    def __init__(self, pits_per_player, max_stones):
+        self.pits = 2 * pits_per_player
+        n = self.pits
+        top = max_stones + n + 1
+        self.binom = [[0] * (n + 1) for _ in range(top + 1)]
+        for i in range(top + 1):
+            self.binom[i][0] = 1
+            for j in range(1, min(i, n) + 1):
+                self.binom[i][j] = self.binom[i - 1][j - 1] + self.binom[i - 1][j]
+        # offset[s] is the number of configurations holding fewer than s stones
+        self.offset = [0] + [self.binom[s - 1 + n][n] for s in range(1, max_stones + 2)]
+        self.size = self.offset[max_stones + 1]
+
+    def index(self, config, stones):
+        binom = self.binom
+        n = self.pits
+        rank = self.offset[stones]
+        left = stones
+        for i in range(n - 1):
+            c = config[i]
+            if c:
+                m = n - i
+                rank += binom[left + m - 1][m - 1] - binom[left - c + m - 1][m - 1]
+                left -= c
+                if left == 0:
+                    break
+        return rank
+
+    def configurations(self, stones, parts=None):
+        """Every configuration holding exactly stones stones."""
+        parts = self.pits if parts is None else parts
+        if parts == 1:
+            yield (stones,)
+            return
+        for c in range(stones + 1):
+            for rest in self.configurations(stones - c, parts - 1):
+                yield (c,) + rest
+
+
+def build(pits_per_player, max_stones, path):
+    """Solves every configuration with up to max_stones stones and writes the database to path."""
+    if max_stones > 127:
+        raise ValueError("max_stones must fit in a signed byte")
+    p = pits_per_player
+    engine = MancalaEngine(p)
+    indexer = _Indexer(p, max_stones)
+    values = array.array('b', bytes(indexer.size))
+    solved = bytearray(indexer.size)
+
+    def children(config):
+        """(gain, child configuration seen from the opponent, child stones) for every move."""
+        state = engine.state_from_board(config[:p] + (0,) + config[p:] + (0,), 1)
+        if engine.terminal_test(state):
+            return []
+        result = []
+        for pit in engine.actions(state):
+            child = engine.make_move(state, pit)
+            mirrored = child[p + 1:2 * p + 1] + child[:p]
+            result.append((child[p], mirrored, sum(mirrored)))
+        return result
+
+    for stones in range(max_stones + 1):
+        for config in indexer.configurations(stones):
+            if solved[indexer.index(config, stones)]:
+                continue
+            stack = [config]
+            on_stack = {config}
+            while stack:
+                top = stack[-1]
+                moves = children(top)
+                pending = [child for _, child, s in moves if s == stones and not solved[indexer.index(child, s)]]
+                if pending:
+                    for child in pending:
+                        if child in on_stack:
+                            raise ValueError(f"cycle between positions with {stones} stones")
+                        stack.append(child)
+                        on_stack.add(child)
+                    continue
+                best = max((gain - values[indexer.index(child, s)] for gain, child, s in moves), default=0)
+                i = indexer.index(top, stones)
+                values[i] = best
+                solved[i] = 1
+                stack.pop()
+                on_stack.discard(top)
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, p, max_stones))
+        values.tofile(f)
+
+
+class EndgameDatabase:
+    """
+    Memory-mapped endgame database. value() and best_move() return None for positions with
+    more stones than the database covers, so callers can fall back to searching.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, pits, max_stones = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} endgame database")
+        self.pits_per_player = pits
+        self.max_stones = max_stones
+        self._values = memoryview(self._map)[HEADER.size:].cast('b')
+        self._indexer = _Indexer(pits, max_stones)
+        self._engine = MancalaEngine(pits)
+        self._state_size = len(self._engine.initial_state(0))
+
+    def future_gain(self, state):
+        """Stones the player to move gains over the opponent from state on, or None if not covered."""
+        p = self.pits_per_player
+        if len(state) != self._state_size:
+            return None
+        if self._engine.to_move(state) == 1:
+            config = state[:p] + state[p + 1:2 * p + 1]
+        else:
+            config = state[p + 1:2 * p + 1] + state[:p]
+        stones = sum(config)
+        if stones > self.max_stones:
+            return None
+        return self._values[self._indexer.index(config, stones)]
+
+    def value(self, state, player):
+        """Exact final mancala difference for player (same units as AIPlayer.utility), or None."""
+        gain = self.future_gain(state)
+        if gain is None:
+            return None
+        p = self.pits_per_player
+        diff = state[p] - state[2 * p + 1]
+        if player == 2:
+            diff = -diff
+        return diff + gain if self._engine.to_move(state) == player else diff - gain
+
+    def best_move(self, state):
+        """(move, exact value for the player to move), or None if the position is not covered."""
+        engine = self._engine
+        if self.future_gain(state) is None or engine.terminal_test(state):
+            return None
+        player = engine.to_move(state)
+        best = None
+        for move in engine.actions(state):
+            v = self.value(engine.make_move(state, move), player)
+            if best is None or v > best[1]:
+                best = (move, v)
+        return best
+
+    @staticmethod
+    def filename(pits_per_player, max_stones):
+        return f"endgame_{pits_per_player}_{max_stones}.bin"
+
+    @classmethod
+    def find(cls, pits_per_player, directory='.'):
+        """Opens the database for this board size in directory that covers the most stones, or
+        returns None if there is none."""
+        prefix, suffix = f"endgame_{pits_per_player}_", '.bin' # see filename
+        found = []
+        for name in os.listdir(directory):
+            stones = name[len(prefix):-len(suffix)]
+            if name.startswith(prefix) and name.endswith(suffix) and stones.isdigit():
+                found.append((int(stones), name))
+        return cls(os.path.join(directory, max(found)[1])) if found else None
+
+    def close(self):
+        self._values.release()
+        self._map.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build Mancala endgame databases")
+    parser.add_argument("--pits", type=int, default=6)
+    parser.add_argument("--stones", type=int, nargs='+', default=[4, 6, 8], help="max stones in play, one database each")
+    parser.add_argument("--output", default="endgame_{pits}_{stones}.bin")
+    parser.add_argument("--probes", type=int, default=100000)
+    args = parser.parse_args()
+
+    for stones in args.stones:
+        path = args.output.format(pits=args.pits, stones=stones)
+        start = time.perf_counter()
+        build(args.pits, stones, path)
+        build_time = time.perf_counter() - start
+
+        db = EndgameDatabase(path)
+        rng = random.Random(0)
+        engine = MancalaEngine(args.pits)
+        states = []
+        while len(states) < 1000:
+            board = [0] * (2 * args.pits + 2)
+            for _ in range(rng.randint(1, stones)):
+                board[rng.choice([i for i in range(len(board)) if i not in (args.pits, 2 * args.pits + 1)])] += 1
+            states.append(engine.state_from_board(board, rng.choice((1, 2))))
+        start = time.perf_counter()
+        for i in range(args.probes):
+            db.value(states[i % len(states)], 1)
+        probe_time = (time.perf_counter() - start) / args.probes
+        db.close()
+        print(f"{path}: K={stones} build {build_time:.2f}s, {os.path.getsize(path):,} bytes, probe {probe_time * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
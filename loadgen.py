@@ -0,0 +1,101 @@
+"""
+Load generator for server.py: --clients connections each play games against the server's AI
+(random moves for player 1, "ai" requests for player 2) for --seconds, then the requests per
+second and the client side latencies are printed, with the server's own metrics.
+
+Usage: python loadgen.py [--port 7878] [--clients 32] [--seconds 10] [--time-ms 50]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, **request):
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+
+async def play(host, port, args, stop_at, latencies, counters, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    client = Client(reader, writer)
+    try:
+        while time.perf_counter() < stop_at:
+            response = await client.request(op='new', pits=args.pits, stones=args.stones)
+            session = response['session']
+            state = response['state']
+            while not state['over'] and time.perf_counter() < stop_at:
+                if state['player'] == 1:
+                    legal = [i + 1 for i, stones in enumerate(state['board'][:args.pits]) if stones]
+                    op, request = 'move', {'op': 'move', 'session': session, 'pit': rng.choice(legal)}
+                else:
+                    op, request = 'ai', {'op': 'ai', 'session': session, 'time_ms': args.time_ms}
+                start = time.perf_counter()
+                response = await client.request(**request)
+                if response.get('error') == 'busy':
+                    counters['busy'] += 1
+                    await asyncio.sleep(response.get('retry_ms', 50) / 1000)
+                    continue
+                latencies[op].append(time.perf_counter() - start)
+                if 'error' in response:
+                    raise RuntimeError(response['error'])
+                state = response['state']
+            if state['over']:
+                counters['games'] += 1
+            await client.request(op='close', session=session)
+    finally:
+        writer.close()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return 1000 * values[min(int(len(values) * q), len(values) - 1)] if values else 0.0
+
+
+async def run(args):
+    latencies = {'move': [], 'ai': []}
+    counters = {'games': 0, 'busy': 0}
+    start = time.perf_counter()
+    stop_at = start + args.seconds
+    await asyncio.gather(*(play(args.host, args.port, args, stop_at, latencies, counters, args.seed + c) for c in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    requests = sum(len(values) for values in latencies.values())
+    print(f"{args.clients} clients, {elapsed:.1f}s: {requests} requests ({requests / elapsed:,.0f}/s), "
+          f"{counters['games']} games finished, {counters['busy']} busy replies")
+    for op, values in latencies.items():
+        print(f"  {op:4} {len(values):7} requests, p50 {percentile(values, 0.5):.1f} ms, p95 {percentile(values, 0.95):.1f} ms, "
+              f"p99 {percentile(values, 0.99):.1f} ms")
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    metrics = (await Client(reader, writer).request(op='metrics'))['metrics']
+    writer.close()
+    print(f"server: {metrics['requests']} requests since start ({metrics['requests_per_second']:,.0f}/s), {metrics['rejected']} rejected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the Mancala game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--time-ms", type=int, default=50, help="AI budget per request")
+    parser.add_argument("--pits", type=int, default=6)
+    parser.add_argument("--stones", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
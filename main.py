@@ -1,10 +1,71 @@
+import json
 import random
-import numpy as np
+import sys
 import math
-from tkinter import *
-import tkinter as tk
-from tkinter import messagebox
+import time
+from collections import OrderedDict
+from records import GameRecordWriter
 #random.seed(109) # use to get reproducible results 
+AI_TIME_LIMIT = 1000 # milliseconds the AI may think per move
+AI_POLL_INTERVAL = 20 # milliseconds between UI checks for a finished AI search
+TABLE_ENTRIES = 100000 # default TranspositionTable size, ~30 MB; a 6x4 search of AI_TIME_LIMIT stores ~40k positions
+
+
+class GameResult:
+    """Outcome of a finished game. winner is 1 or 2, or 0 for a tie."""
+    def __init__(self, winner, p1_score, p2_score, turns):
+        self.winner = winner
+        self.p1_score = p1_score
+        self.p2_score = p2_score
+        self.turns = turns
+
+    def __str__(self):
+        if self.winner == 0:
+            return "It's a TIE!"
+        return f"Player {self.winner} wins!"
+
+
+class GameObserver:
+    """
+    Receives game events from Mancala. The engine itself never prints, so headless games do
+    no I/O unless an observer is attached. Override only the events you need.
+    """
+    def on_move(self, game, player, pit):
+        pass
+
+    def on_invalid_move(self, game, pit):
+        pass
+
+    def on_game_over(self, game, result):
+        pass
+
+
+class ConsoleObserver(GameObserver):
+    """Prints the game to the terminal; show_board also prints the board after every move."""
+    def __init__(self, show_board=False):
+        self.show_board = show_board
+
+    def on_move(self, game, player, pit):
+        if self.show_board:
+            print(f"Selected pit {pit}")
+            game.display_board()
+
+    def on_invalid_move(self, game, pit):
+        print("INVALID MOVE")
+
+    def on_game_over(self, game, result):
+        print("GAME OVER")
+        print(result)
+
+
+class GameRecorder(GameObserver):
+    """Appends every finished game to a records.GameRecordWriter; seed goes into the record header."""
+    def __init__(self, writer, seed=None):
+        self.writer = writer
+        self.seed = seed
+
+    def on_game_over(self, game, result):
+        self.writer.write(game.pits_per_player, game.stones_per_pit, self.seed, [pit for _, pit in game.moves])
 
 
 class Mancala:
@@ -22,6 +83,7 @@ class Mancala:
         p1_mancala_index and p2_mancala_index: These variables hold the indices of the Mancala pits on the board for players 1 and 2, respectively.
         """
         self.pits_per_player = pits_per_player
+        self.stones_per_pit = stones_per_pit
         self.board = [stones_per_pit] * ((pits_per_player+1) * 2)  # Initialize each pit with stones_per_pit number of stones 
         self.players = 2
         self.current_player = 1
@@ -38,6 +100,16 @@ class Mancala:
         # turn counter
         self.turn_number = 0
 
+        # observers get notified of moves and the end of the game, see GameObserver
+        self.observers = []
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def notify(self, event, *args):
+        for observer in self.observers:
+            getattr(observer, event)(self, *args)
+
     def display_board(self):
         """
         Displays the board in a user-friendly format
@@ -118,11 +190,12 @@ class Mancala:
     def play_turn(self, pit):
         """
         This function simulates a single move made by a specific player using their selected pit. It primarily performs three tasks:
-        1. It checks if the chosen pit is a valid move for the current player. If not, it prints "INVALID MOVE" and takes no action.
-        2. It verifies if the game board has already reached a winning state. If so, it prints "GAME OVER" and takes no further action.
-        3. After passing the above two checks, it proceeds to distribute the stones according to the specified Mancala rules.
+        1. It checks if the chosen pit is a valid move for the current player. If not, it notifies observers of the invalid move and takes no action.
+        2. It does not check for the end of the game: callers use winning_eval (which notifies observers with on_game_over) or is_game_over between moves.
+        3. After passing the check, it proceeds to distribute the stones according to the specified Mancala rules.
 
-        Finally, the function then switches the current player, allowing the other player to take their turn.
+        Finally, the function then switches the current player, allowing the other player to take their turn, and notifies observers
+        of the move. Nothing is printed here; attach a ConsoleObserver for terminal output.
         """
         #print(f'P{self.current_player} chose pit {pit}\n')
         player = self.current_player
@@ -144,7 +217,8 @@ class Mancala:
 
 
         if self.valid_move(pit) == False:
-            print("INVALID MOVE")
+            if self.observers:
+                self.notify('on_invalid_move', pit)
             return
         self.moves.append((player, pit))
         self.board[index] = 0
@@ -169,33 +243,44 @@ class Mancala:
                 self.board[index] = 0
         self.current_player = 2 if player == 1 else 1
         self.turn_number += 1
+        if self.observers:
+            self.notify('on_move', player, pit)
     
     def play_random_verse_random(self):
-
+        """Plays random moves for both players until the game ends; attach ConsoleObserver(show_board=True) to watch."""
         # note: random seed is set at top of file
         turn_counter = 0
-        self.display_board()
         while not self.winning_eval():
             move = self.random_move_generator()
-            print(f"Selected pit {move}") 
             self.play_turn(move)
-            self.display_board()
             turn_counter += 1
 
         return turn_counter
 
+    def is_game_over(self):
+        """Pure terminal check: True if either player's pits are all empty. No side effects."""
+        p1_start_pit, p1_end_pit = self.p1_pits_index
+        p2_start_pit, p2_end_pit = self.p2_pits_index
+        return self.winning_eval_helper(p1_start_pit, p1_end_pit) or self.winning_eval_helper(p2_start_pit, p2_end_pit)
+
+    def game_result(self):
+        """Returns a GameResult for a finished game, or None while it is still going."""
+        if not self.is_game_over():
+            return None
+        p1 = self.board[self.p1_mancala_index]
+        p2 = self.board[self.p2_mancala_index]
+        winner = 1 if p1 > p2 else 2 if p2 > p1 else 0
+        return GameResult(winner, p1, p2, self.turn_number)
+
     def winning_eval(self):
         """
         Function to verify if the game board has reached the winning state.
         Hint: If either of the players' pits are all empty, then it is considered a winning state.
+        Observers are told the result with on_game_over; use is_game_over for a check without events.
         """
-        # write your code here
-        p1_start_pit, p1_end_pit = self.p1_pits_index
-        p2_start_pit, p2_end_pit = self.p2_pits_index
-
-        if self.winning_eval_helper(p1_start_pit, p1_end_pit) or self.winning_eval_helper(p2_start_pit, p2_end_pit):
-            print("GAME OVER")
-            self.evaluate_end_state()
+        if self.is_game_over():
+            if self.observers:
+                self.notify('on_game_over', self.game_result())
             return True
         
         return False
@@ -207,164 +292,796 @@ class Mancala:
             else:
                 return False
         return True
-    
-    def evaluate_end_state(self):
-        p1_mancala = self.p1_mancala_index
-        p2_mancala = self.p2_mancala_index
-
-        if self.board[p1_mancala] > self.board[p2_mancala]:
-            print("Player 1 wins!")
-        elif self.board[p1_mancala] < self.board[p2_mancala]:
-            print("Player 2 wins!")
+
+FEATURES = ('store', 'stones', 'mobility', 'exact', 'threat')
+DEFAULT_WEIGHTS = {'store': 1.0, 'stones': 0.1651, 'mobility': -0.3435, 'exact': -0.2309, 'threat': 0.1791} # tune.py, 1500 games on 6x4
+
+
+class WeightedEvaluation:
+    """
+    Evaluation function for alpha_beta_cutoff_search (pass it as eval_fn) that adds cheap
+    positional features to the mancala difference used by AIPlayer.utility. Each feature is
+    player 1's value minus player 2's:
+        store     stones in the mancala
+        stones    stones still in the player's pits
+        mobility  non-empty pits
+        exact     pits whose stones end exactly in the player's mancala
+        threat    best capture available (captured stones + 1)
+    The result is seen from player, the player the search is run for. weights maps feature names
+    to weights; tune.py fits them from self-play games. With the store weight at 1 the scores stay
+    in stones, so they mix with exact endgame database values.
+    It is opt-in: main() and the UI search with the plain utility, compare the two with
+    tournament.py (eval:K against alphabeta:K) before switching.
+    """
+    def __init__(self, game, player, weights=None):
+        self.game = game
+        self.player = player
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self._vector = tuple(self.weights[name] for name in FEATURES)
+
+    def features(self, state):
+        game = self.game
+        s1, m1, e1, t1 = game.side_features(state, 1)
+        s2, m2, e2, t2 = game.side_features(state, 2)
+        return (state[game.p1_mancala_index] - state[game.p2_mancala_index], s1 - s2, m1 - m2, e1 - e2, t1 - t2)
+
+    def __call__(self, state):
+        score = sum(w * f for w, f in zip(self._vector, self.features(state)))
+        return score if self.player == 1 else -score
+
+    @staticmethod
+    def load_weights(path):
+        with open(path) as f:
+            return json.load(f)
+
+
+class SearchStats:
+    """
+    Opt-in counters filled in by minmax_decision, alpha_beta_cutoff_search and
+    iterative_deepening_search when passed as stats=. Searches only touch it when it is given.
+    Depths are plies from the root (the root's children are at depth 1).
+    """
+    def __init__(self):
+        self.nodes = 0
+        self.leaves = 0
+        self.nodes_by_depth = {}
+        self.cutoffs_by_depth = {}
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.iterations = [] # one entry per completed search depth: depth, nodes, time
+        self.time = 0.0
+
+    def visit(self, depth):
+        self.nodes += 1
+        self.nodes_by_depth[depth] = self.nodes_by_depth.get(depth, 0) + 1
+
+    def cutoff(self, depth):
+        self.cutoffs_by_depth[depth] = self.cutoffs_by_depth.get(depth, 0) + 1
+
+    def completed(self, depth, nodes, elapsed):
+        if self.iterations and self.iterations[-1]['depth'] == depth: # aspiration re-search of the same depth
+            self.iterations[-1]['nodes'] += nodes
+            self.iterations[-1]['time'] += elapsed
         else:
-            print("It's a TIE!")
+            self.iterations.append({'depth': depth, 'nodes': nodes, 'time': elapsed})
+
+    def effective_branching_factor(self):
+        """Growth of the node count per extra ply: between the last two iterations, else nodes ** (1 / depth)."""
+        if len(self.iterations) >= 2 and self.iterations[-2]['nodes']:
+            return self.iterations[-1]['nodes'] / self.iterations[-2]['nodes']
+        if self.iterations and self.iterations[-1]['depth']:
+            return self.iterations[-1]['nodes'] ** (1 / self.iterations[-1]['depth'])
+        return 0.0
+
+    def to_dict(self):
+        return {'nodes': self.nodes, 'leaves': self.leaves, 'time': self.time,
+                'nodes_per_second': self.nodes / self.time if self.time else 0.0,
+                'depth': self.iterations[-1]['depth'] if self.iterations else 0,
+                'effective_branching_factor': self.effective_branching_factor(),
+                'nodes_by_depth': self.nodes_by_depth, 'cutoffs_by_depth': self.cutoffs_by_depth,
+                'tt_probes': self.tt_probes, 'tt_hits': self.tt_hits, 'iterations': self.iterations}
 
-def minmax_decision(state, game, depthLimit): #Note: Added a depth limit to limit run time
+
+def minmax_decision(state, game, depthLimit, stats=None): #Note: Added a depth limit to limit run time
     """Given a state in a game, calculate the best move by searching
-    forward all the way to the terminal states. [Figure 5.3]"""
+    forward all the way to the terminal states. [Figure 5.3]
+    stats is an optional SearchStats to fill in."""
 
     player = game.to_move(state)
 
     def max_value(state, depth):
+        if stats is not None:
+            stats.visit(depthLimit - depth + 1)
         if game.terminal_test(state) or depth == 0:
+            if stats is not None:
+                stats.leaves += 1
             return game.utility(state, player)
-        v = -np.inf
+        v = -math.inf
         for a in game.actions(state):
             v = max(v, min_value(game.result(state, a), depth - 1))
         return v
 
     def min_value(state, depth):
+        if stats is not None:
+            stats.visit(depthLimit - depth + 1)
         if game.terminal_test(state) or depth == 0:
+            if stats is not None:
+                stats.leaves += 1
             return game.utility(state, player)
-        v = np.inf
+        v = math.inf
         for a in game.actions(state):
             v = min(v, max_value(game.result(state, a), depth - 1))
         return v
 
     # Body of minmax_decision:
-    return max(game.actions(state), key=lambda a: min_value(game.result(state, a), depthLimit))
+    if stats is None:
+        return max(game.actions(state), key=lambda a: min_value(game.result(state, a), depthLimit))
+    start, nodes = time.perf_counter(), stats.nodes
+    action = max(game.actions(state), key=lambda a: min_value(game.result(state, a), depthLimit))
+    elapsed = time.perf_counter() - start
+    stats.time += elapsed
+    stats.completed(depthLimit + 1, stats.nodes - nodes, elapsed)
+    return action
+
+EXACT, LOWER, UPPER = 0, 1, 2 # bound types stored in the transposition table
+NULL_WINDOW = 1e-9 # width of the scout windows of a pvs search, small enough for fractional evaluations
+ASPIRATION_WINDOW = 4 # stones either side of the previous iteration's score in a pvs iterative deepening search
+
+
+class TranspositionTable:
+    """
+    Bounded transposition table for alpha_beta_cutoff_search.
+
+    Entries are keyed by the compact state tuple itself (see MancalaEngine), so two different
+    positions can never collide. Each entry stores (depth, score, bound, best_move), where depth
+    is the remaining search depth below the position. When the table holds max_entries positions,
+    the least recently used entry is evicted. An entry takes about 300 bytes, so size the table
+    for the searches it serves rather than the whole game.
+
+    The same table can be passed to successive searches in one game so work from the previous
+    move is reused. Scores are only valid for one root player and one eval_fn, so the table
+    clears itself if either changes.
+    """
+    def __init__(self, max_entries=TABLE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.owner = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.cutoffs = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def clear(self):
+        self.entries.clear()
+
+    def claim(self, owner):
+        """Make sure the stored scores belong to owner, a (player, eval_fn) pair."""
+        if self.owner != owner:
+            self.clear()
+            self.owner = owner
+
+    def probe(self, state):
+        self.probes += 1
+        entry = self.entries.get(state)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(state)
+        return entry
+
+    def store(self, state, depth, score, bound, best_move):
+        entries = self.entries
+        old = entries.get(state)
+        if old is not None:
+            if old[0] > depth: # keep the deeper result
+                return
+            entries.move_to_end(state)
+        elif len(entries) >= self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+        entries[state] = (depth, score, bound, best_move)
+        self.stores += 1
+
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'probes': self.probes, 'hits': self.hits,
+                'misses': self.probes - self.hits, 'hit_rate': self.hit_rate(), 'cutoffs': self.cutoffs,
+                'stores': self.stores, 'evictions': self.evictions}
+
+
+class MoveOrdering:
+    """
+    Move ordering for alpha_beta_cutoff_search, kept across searches.
+
+    Moves are tried in this order: the transposition table / principal variation move,
+    captures and moves ending in the player's own mancala (game.tactical_score), the two
+    killer moves of the current ply, and finally by history score. Killers are reset at the
+    start of every search while the history table is halved, so it slowly forgets old moves.
+    """
+    def __init__(self, game, killers=True, history=True):
+        self.tactical_score = getattr(game, 'tactical_score', None)
+        self.to_move = game.to_move
+        self.use_killers = killers
+        self.use_history = history
+        self.killers = {}
+        self.history = {}
 
-def alpha_beta_cutoff_search(state, game, d=4, cutoff_test=None, eval_fn=None):
+    def new_search(self):
+        self.killers = {}
+        for key in self.history:
+            self.history[key] //= 2
+
+    def order(self, state, moves, depth, first=None):
+        if len(moves) < 2:
+            return moves
+        tactical = self.tactical_score
+        killers = self.killers.get(depth, ())
+        history = self.history
+        player = self.to_move(state)
+
+        def key(move):
+            return (move == first,
+                    tactical(state, move) if tactical else 0,
+                    move in killers,
+                    history.get((player, move), 0))
+        return sorted(moves, key=key, reverse=True) # sorted is stable, so ties keep the actions order
+
+    def cutoff(self, state, move, depth, remaining):
+        """Record a move that caused a beta (or alpha) cutoff."""
+        if self.use_killers:
+            killers = self.killers.get(depth, ())
+            if move not in killers:
+                self.killers[depth] = (move,) + killers[:1]
+        if self.use_history:
+            key = (self.to_move(state), move)
+            self.history[key] = self.history.get(key, 0) + remaining * remaining
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its deadline has passed."""
+
+
+def alpha_beta_cutoff_search(state, game, d=4, cutoff_test=None, eval_fn=None, table=None, deadline=None, first_move=None,
+                             root_moves=None, alpha=-math.inf, with_score=False, ordering=None, endgame=None, stop=None, stats=None,
+                             pvs=False, beta=math.inf, book=None):
     """Search game to determine best action; use alpha-beta pruning.
-    This version cuts off search and uses an evaluation function."""
+    This version cuts off search and uses an evaluation function.
+    If a TranspositionTable is given as table it is probed and filled during the search;
+    it is only used with the default cutoff_test, since it needs to know the remaining depth.
+    deadline is a time.perf_counter() value after which SearchTimeout is raised, as it is once
+    stop (a threading.Event) is set, and first_move is tried first at the root.
+    root_moves restricts the root to the given moves and alpha sets the root's lower bound;
+    with_score=True returns (best_action, best_score) instead of just the action.
+    ordering is an optional MoveOrdering; without it moves are searched in game.actions order.
+    endgame is an optional EndgameDatabase (see endgame.py); positions it covers are scored exactly
+    instead of searched, and a covered root returns its best move straight away.
+    stats is an optional SearchStats to fill in.
+    pvs=True searches like PVS/NegaScout: every move after the first is only tested with a null
+    window around the best score so far and re-searched with the full window if it beats it.
+    The chosen move is the same as without pvs, but fewer nodes are searched when the move
+    ordering is good. beta sets the root's upper bound (an aspiration window together with
+    alpha); the root stops at the first move scoring beta or more.
+    book is an optional OpeningBook (see book.py); a root in it returns the book move without
+    searching, unless with_score asks for a score the book does not have."""
 
     player = game.to_move(state)
+    if cutoff_test is not None:
+        table = None
+    if table is not None:
+        table.claim((player, eval_fn))
+    if ordering is not None:
+        ordering.new_search()
+
+    def probe(state, alpha, beta, remaining):
+        """Returns (score or None, best move) from the table."""
+        entry = table.probe(state)
+        if stats is not None:
+            stats.tt_probes += 1
+            stats.tt_hits += entry is not None
+        if entry is None:
+            return None, None
+        depth, score, bound, move = entry
+        if depth >= remaining:
+            if bound == EXACT or (bound == LOWER and score >= beta) or (bound == UPPER and score <= alpha):
+                table.cutoffs += 1
+                return score, move
+        return None, move
+
+    def ordered(state, first, depth):
+        actions = game.actions(state)
+        if ordering is not None:
+            return ordering.order(state, actions, depth, first)
+        if first is not None and first in actions and actions[0] != first:
+            actions.remove(first)
+            actions.insert(0, first)
+        return actions
+
+    def bound_of(v, alpha, beta):
+        if v <= alpha:
+            return UPPER
+        if v >= beta:
+            return LOWER
+        return EXACT
+
+    def scout(search, state, alpha, beta, depth, later):
+        """Value of a child; with pvs, a later (not first) child gets a null window test first.
+        A max node tests whether the child beats alpha, a min node whether it stays below beta;
+        if it does, the child is searched again between the bound found and the other side."""
+        if pvs and later:
+            if search is min_value:
+                null_alpha, null_beta = alpha, alpha + NULL_WINDOW
+            else:
+                null_alpha, null_beta = beta - NULL_WINDOW, beta
+            if alpha < null_alpha or null_beta < beta:
+                v = search(state, null_alpha, null_beta, depth)
+                if not alpha < v < beta:
+                    return v
+                if search is min_value:
+                    alpha = v
+                else:
+                    beta = v
+        return search(state, alpha, beta, depth)
 
     # Functions used by alpha_beta
     def max_value(state, alpha, beta, depth):
+        if stats is not None:
+            stats.visit(depth)
+        if endgame is not None:
+            exact = endgame.value(state, player)
+            if exact is not None:
+                if stats is not None:
+                    stats.leaves += 1
+                return exact
         if cutoff_test(state, depth):
+            if stats is not None:
+                stats.leaves += 1
             return eval_fn(state)
-        v = -np.inf
-        for a in game.actions(state):
-            v = max(v, min_value(game.result(state, a), alpha, beta, depth + 1))
+        if deadline is not None and time.perf_counter() > deadline:
+            raise SearchTimeout()
+        if stop is not None and stop.is_set():
+            raise SearchTimeout()
+        best = None
+        if table is not None:
+            score, best = probe(state, alpha, beta, d - depth + 1)
+            if score is not None:
+                return score
+        alpha_orig = alpha
+        v = -math.inf
+        best_move = None
+        for a in ordered(state, best, depth):
+            child = scout(min_value, game.result(state, a), alpha, beta, depth + 1, best_move is not None)
+            if child > v:
+                v = child
+                best_move = a
             if v >= beta:
-                return v
+                if ordering is not None:
+                    ordering.cutoff(state, a, depth, d - depth + 1)
+                if stats is not None:
+                    stats.cutoff(depth)
+                break
             alpha = max(alpha, v)
+        if table is not None:
+            table.store(state, d - depth + 1, v, bound_of(v, alpha_orig, beta), best_move)
         return v
 
     def min_value(state, alpha, beta, depth):
+        if stats is not None:
+            stats.visit(depth)
+        if endgame is not None:
+            exact = endgame.value(state, player)
+            if exact is not None:
+                if stats is not None:
+                    stats.leaves += 1
+                return exact
         if cutoff_test(state, depth):
+            if stats is not None:
+                stats.leaves += 1
             return eval_fn(state)
-        v = np.inf
-        for a in game.actions(state):
-            v = min(v, max_value(game.result(state, a), alpha, beta, depth + 1))
+        if deadline is not None and time.perf_counter() > deadline:
+            raise SearchTimeout()
+        if stop is not None and stop.is_set():
+            raise SearchTimeout()
+        best = None
+        if table is not None:
+            score, best = probe(state, alpha, beta, d - depth + 1)
+            if score is not None:
+                return score
+        beta_orig = beta
+        v = math.inf
+        best_move = None
+        for a in ordered(state, best, depth):
+            child = scout(max_value, game.result(state, a), alpha, beta, depth + 1, best_move is not None)
+            if child < v:
+                v = child
+                best_move = a
             if v <= alpha:
-                return v
+                if ordering is not None:
+                    ordering.cutoff(state, a, depth, d - depth + 1)
+                if stats is not None:
+                    stats.cutoff(depth)
+                break
             beta = min(beta, v)
+        if table is not None:
+            table.store(state, d - depth + 1, v, bound_of(v, alpha, beta_orig), best_move)
         return v
 
     # Body of alpha_beta_cutoff_search starts here:
     # The default test cuts off at depth d or at a terminal state
     cutoff_test = (cutoff_test or (lambda state, depth: depth > d or game.terminal_test(state)))
     eval_fn = eval_fn or (lambda state: game.utility(state, player))
-    best_score = -np.inf
-    beta = np.inf
+    if book is not None and root_moves is None and not with_score:
+        move = book.best_move(game, state)
+        if move is not None:
+            return move
+    if endgame is not None and root_moves is None:
+        solved = endgame.best_move(state)
+        if solved is not None:
+            return solved if with_score else solved[0]
+    if stats is not None:
+        start, nodes = time.perf_counter(), stats.nodes
+    best_score = -math.inf
     best_action = None
-    for a in game.actions(state):
-        v = min_value(game.result(state, a), best_score, beta, 1)
+    for a in (root_moves if root_moves is not None else ordered(state, first_move, 0)):
+        v = scout(min_value, game.result(state, a), max(alpha, best_score), beta, 1, best_action is not None)
         if v > best_score:
             best_score = v
             best_action = a
+            if v >= beta:
+                break
+    if stats is not None:
+        elapsed = time.perf_counter() - start
+        stats.time += elapsed
+        stats.completed(d, stats.nodes - nodes, elapsed)
+    if with_score:
+        return best_action, best_score
     return best_action
 
 
-class AIPlayer(Mancala):
-    def __init__(self, pits_per_player=6, stones_per_pit=4):
-        super().__init__(pits_per_player, stones_per_pit) #Used to avoid duplication of Mancala Class 
+def iterative_deepening_search(state, game, time_limit=1000, max_depth=100, eval_fn=None, table=None, ordering=None, order_moves=True,
+                               endgame=None, stop=None, stats=None, pvs=False, book=None):
+    """Run alpha_beta_cutoff_search at depth 1, 2, 3, ... until time_limit (milliseconds) runs out
+    and return the best move of the deepest completed iteration.
+    Each iteration searches the previous best move first and, through the transposition table,
+    the rest of the previous principal variation, so deeper iterations prune more.
+    With order_moves a MoveOrdering is used (a new one unless ordering is given).
+    endgame is passed on to alpha_beta_cutoff_search; a covered root is answered without searching,
+    as is a root in book (an OpeningBook, see book.py).
+    Setting stop (a threading.Event) ends the search early with the best move found so far.
+    stats is an optional SearchStats; it gets one iterations entry per completed depth.
+    pvs=True searches every iteration in pvs mode with an aspiration window of ASPIRATION_WINDOW
+    around the previous iteration's score; a score outside the window is searched again with
+    that side opened up."""
+    deadline = time.perf_counter() + time_limit / 1000
+    table = table if table is not None else TranspositionTable()
+    if not order_moves:
+        ordering = None
+    elif ordering is None:
+        ordering = MoveOrdering(game)
+    actions = game.actions(state)
+    if len(actions) == 1:
+        return actions[0]
+    if book is not None:
+        move = book.best_move(game, state)
+        if move is not None:
+            return move
+    if endgame is not None:
+        solved = endgame.best_move(state)
+        if solved is not None:
+            return solved[0]
+    best_action = None
+    score = None
+    if stats is not None:
+        start, time_before = time.perf_counter(), stats.time
+    for depth in range(1, max_depth + 1):
+        alpha, beta = -math.inf, math.inf
+        if pvs and score is not None:
+            alpha, beta = score - ASPIRATION_WINDOW, score + ASPIRATION_WINDOW
+        try:
+            while True:
+                action, score = alpha_beta_cutoff_search(state, game, depth, None, eval_fn, table, deadline, best_action, alpha=alpha,
+                                                         with_score=True, ordering=ordering, endgame=endgame, stop=stop, stats=stats,
+                                                         pvs=pvs, beta=beta)
+                if score <= alpha:
+                    alpha = -math.inf
+                elif score >= beta:
+                    beta = math.inf
+                else:
+                    break
+            best_action = action
+        except SearchTimeout:
+            break
+    if stats is not None:
+        stats.time = time_before + time.perf_counter() - start # includes the unfinished last iteration
+    return best_action if best_action is not None else actions[0]
+
+
+_worker_table = None # per process transposition table of a ParallelSearch worker
+
+
+def _init_search_worker(table_size):
+    global _worker_table
+    _worker_table = TranspositionTable(table_size)
+
+
+def _search_root_move(args):
+    """Worker task: the score of one root move, searched with the lower bound alpha."""
+    state, game, d, eval_fn, move, alpha = args
+    return alpha_beta_cutoff_search(state, game, d, None, eval_fn, _worker_table, root_moves=[move], alpha=alpha, with_score=True)[1]
+
+
+class ParallelSearch:
+    """
+    Root split alpha-beta search on a process pool (Young Brothers Wait at the root).
+
+    The first root move is searched on its own to get a bound, then all other root moves
+    are searched in parallel with that bound as alpha. A move can only beat the first one
+    with an exact score, so the chosen move is the same as alpha_beta_cutoff_search at equal depth.
+    The pool and each worker's transposition table live until close(), so they are reused
+    across moves. eval_fn has to be picklable (a module level function, not a lambda).
+    """
+    def __init__(self, workers=None, table_size=TABLE_ENTRIES):
+        import multiprocessing # only here, so importing this module stays cheap for headless workers
+        self.workers = workers or multiprocessing.cpu_count()
+        self.pool = multiprocessing.Pool(self.workers, initializer=_init_search_worker, initargs=(table_size,))
+
+    def search(self, state, game, d=4, eval_fn=None):
+        actions = game.actions(state)
+        if len(actions) == 1:
+            return actions[0]
+        best_action = actions[0]
+        best_score = self.pool.apply(_search_root_move, ((state, game, d, eval_fn, best_action, -math.inf),))
+        tasks = [(state, game, d, eval_fn, a, best_score) for a in actions[1:]]
+        for a, v in zip(actions[1:], self.pool.map(_search_root_move, tasks, chunksize=1)):
+            if v > best_score:
+                best_score = v
+                best_action = a
+        return best_action
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MancalaEngine:
+    """
+    Compact move engine used by the search functions.
+
+    A state is a flat tuple holding the whole board, the player to move, a bitmask of the
+    non-empty pits (bit i set if board[i] > 0) and the stones left in each player's row:
+    (p1 pits..., p1 mancala, p2 pits..., p2 mancala, current_player, pit_mask, p1 stones, p2 stones).
+    Tuples are immutable and hashable, so a move only allocates the new state instead of a whole
+    Mancala object. make_move keeps the bitmask and the stone totals up to date from tables
+    precomputed per player and pit, so terminal_test reads two slots and actions is a table
+    lookup instead of scanning the pits.
+    make_move assumes the move came from actions() and does not re-check it.
+    """
+    def __init__(self, pits_per_player=6):
+        self.pits_per_player = pits_per_player
+        p = pits_per_player
+        self._board_size = (p + 1) * 2
+        self._player_slot = self._board_size # index of current player inside a state
+        self._mask_slot = self._board_size + 1 # index of the non-empty pit bitmask
+        self._stones_slot = {1: self._board_size + 2, 2: self._board_size + 3} # stones left in each row
+        self._cycle = self._board_size - 1 # sowing skips the opponent's mancala
+        self._first_pit = {1: 0, 2: p + 1}
+        self._last_pit = {1: p - 1, 2: 2 * p}
+        self._store = {1: p, 2: 2 * p + 1}
+        self._opposite_base = 2 * p # opposite pit of index i is always 2p - i
+        self._pit_indices = {player: tuple((pit, self._first_pit[player] + pit - 1) for pit in range(1, p + 1))
+                             for player in (1, 2)}
+
+        # For every player and every pit, the board indices that get a stone, in sowing order
+        self._sow_paths = {}
+        for player in (1, 2):
+            skip = self._store[3 - player]
+            paths = {}
+            for _, index in self._pit_indices[player]:
+                path = []
+                i = index
+                while len(path) < self._cycle:
+                    i = (i + 1) % self._board_size
+                    if i != skip:
+                        path.append(i)
+                paths[index] = tuple(path)
+            self._sow_paths[player] = paths
+
+        # Bitmasks of each player's row and of the pits a capture empties
+        self._row_mask = {player: sum(1 << index for _, index in self._pit_indices[player]) for player in (1, 2)}
+        self._capture_keep_mask = {index: ~((1 << index) | (1 << (self._opposite_base - index)))
+                                   for player in (1, 2) for _, index in self._pit_indices[player]}
+        self._mask_moves = {1: {}, 2: {}} # row bits -> legal pits, filled in on first use
+
+        # Per player and pit (1 based, slot 0 unused): (index, mask without the pit, own and opponent
+        # stones slot, mancala, sowings) where sowings[k] describes sowing k stones (k = cycle is a
+        # full lap): (board indices reached, last index, bits of the pits reached, stones into the own
+        # row, stones into the opponent's row, whether the last stone can capture)
+        self._moves = {}
+        for player in (1, 2):
+            own, other = self._row_mask[player], self._row_mask[3 - player]
+            moves = [None]
+            for _, index in self._pit_indices[player]:
+                path = self._sow_paths[player][index]
+                sowings = [None]
+                for k in range(1, self._cycle + 1):
+                    targets = path[:k]
+                    bits = sum(1 << i for i in targets) & (own | other)
+                    sowings.append((targets, targets[-1], bits, (bits & own).bit_count(), (bits & other).bit_count(),
+                                    bool(1 << targets[-1] & own)))
+                moves.append((index, ~(1 << index), self._stones_slot[player], self._stones_slot[3 - player],
+                              self._store[player], tuple(sowings)))
+            self._moves[player] = tuple(moves)
+
+    def initial_state(self, stones_per_pit=4):
+        p = self.pits_per_player
+        row = (stones_per_pit,) * p
+        return self.state_from_board(row + (0,) + row + (0,), 1)
+
+    def state_from_board(self, board, current_player):
+        p = self.pits_per_player
+        mask = 0
+        for i, stones in enumerate(board):
+            if stones:
+                mask |= 1 << i
+        mask &= self._row_mask[1] | self._row_mask[2]
+        return tuple(board) + (current_player, mask, sum(board[0:p]), sum(board[p + 1:2 * p + 1]))
+
+    def make_move(self, state, pit):
+        """Sow the stones of pit (1 to pits_per_player) for the player to move, apply the capture rule and return the new state."""
+        board = list(state)
+        self.sow(board, pit)
+        return tuple(board)
+
+    result = make_move # search protocol name for make_move, bound directly to save a call per node
+
+    def sow(self, board, pit):
+        """Same as make_move but works in place on a list copy of a state, so playouts can reuse one list."""
+        player_slot = self._player_slot
+        player = board[player_slot]
+        index, keep, own_slot, other_slot, store, sowings = self._moves[player][pit]
+        stones = board[index]
+        board[index] = 0
+        cycle = self._cycle
+        if stones < cycle:
+            targets, last, bits, mine, theirs, capturable = sowings[stones]
+            for i in targets:
+                board[i] += 1
+        else:
+            laps, rest = divmod(stones, cycle)
+            targets, last, bits, mine, theirs, capturable = sowings[cycle]
+            for i in targets:
+                board[i] += laps
+            mine *= laps
+            theirs *= laps
+            if rest: # rest == 0 means a full lap ending on the last index of the path
+                targets, last, _, rest_mine, rest_theirs, capturable = sowings[rest]
+                for i in targets:
+                    board[i] += 1
+                mine += rest_mine
+                theirs += rest_theirs
+        mask = (board[self._mask_slot] & keep) | bits
+        board[own_slot] += mine - stones
+        board[other_slot] += theirs
+        #Capture conditions, same as Mancala.play_turn
+        if capturable and board[last] == 1:
+            opposite = self._opposite_base - last
+            captured = board[opposite]
+            board[store] += captured + 1
+            board[opposite] = 0
+            board[last] = 0
+            board[own_slot] -= 1
+            board[other_slot] -= captured
+            mask &= self._capture_keep_mask[last]
+        board[player_slot] = 3 - player
+        board[self._mask_slot] = mask
+
+    def tactical_score(self, state, pit):
+        """Cheap move ordering hint: 2 + stones captured (roughly) for a capture, 1 for ending in the own mancala, else 0."""
+        index, _, _, _, store, sowings = self._moves[state[self._player_slot]][pit]
+        stones = state[index]
+        if stones < self._cycle:
+            _, last, _, _, _, capturable = sowings[stones]
+            if capturable and state[last] == 0:
+                return 2 + state[self._opposite_base - last]
+        else:
+            last = sowings[stones % self._cycle or self._cycle][1]
+        return 1 if last == store else 0
+
+    def side_features(self, state, player):
+        """Cheap features of one player's row: (stones, non-empty pits, pits that end exactly in the mancala, best capture)."""
+        first = self._first_pit[player]
+        store = self._store[player]
+        stones = state[self._stones_slot[player]]
+        mobility = (state[self._mask_slot] & self._row_mask[player]).bit_count()
+        exact = 0
+        threat = 0
+        paths = self._sow_paths[player]
+        for _, index in self._pit_indices[player]:
+            s = state[index]
+            if not s:
+                continue
+            if s == store - index:
+                exact += 1
+            elif s < self._cycle:
+                last = paths[index][s - 1]
+                if first <= last < store and not state[last]:
+                    threat = max(threat, state[self._opposite_base - last] + 1)
+        return stones, mobility, exact, threat
+
+    def legal_moves(self, state):
+        """Tuple of the legal pits for the player to move, shared between calls; actions returns a list copy."""
+        player = state[self._player_slot]
+        row = state[self._mask_slot] & self._row_mask[player]
+        moves = self._mask_moves[player].get(row)
+        if moves is None:
+            moves = self._mask_moves[player][row] = tuple(pit for pit, index in self._pit_indices[player] if row >> index & 1)
+        return moves
 
     def actions(self, state):
         """Return a list of the allowable moves at this point."""
-        valid_moves = []
-        current_player = state['currentPlayer']
-        board = state['board']
-        start = 0
-        end = 0
-        
-        if current_player == 1:
-            start = self.p1_pits_index[0] 
-            end = self.p1_pits_index[1] + 1
-            for pit in range(start, end):
-                if board[pit] > 0:
-                    valid_moves.append(pit - self.p1_pits_index[0]+1) # board is actually 0 indexed, so pit 1 corresponds to self.board[0]
-        elif current_player == 2:
-            start = self.p2_pits_index[0] 
-            end = self.p2_pits_index[1] + 1 
-            for pit in range(start, end):
-                if board[pit] > 0:
-                    valid_moves.append(pit - self.p2_pits_index[0]+1) # board is actually 0 indexed, so pit 1 corresponds to self.board[0]
-        return valid_moves
-    
-    def utility(self, state, player): #This is the utility function that will be calculated for each individual board
-        board = state['board']
-        
-        if player == 1:
-            maxMancala = self.p1_mancala_index
-            minMancala = self.p2_mancala_index #Utility function given to us to use
-        else: 
-            maxMancala = self.p2_mancala_index
-            minMancala = self.p1_mancala_index
+        return list(self.legal_moves(state))
 
-        return board[maxMancala] - board[minMancala] #Utility function 
-    
-    def getState(self): #helper function
-        return {'board': self.board[:], 'currentPlayer': self.current_player} #Used a dictionary syntax to make more legible 
-    
-    def result(self, state, move): #What this does is it takes a state and from there it makes a move and returns the result of the move
-        """Return the state that results from making a move from a state.""" 
-        game = Mancala(self.pits_per_player, 0) #Don't need to initialize this because board is copied over
-        game.board = state['board'][:] 
-        game.current_player = state['currentPlayer']
-        game.play_turn(move)
-        return {'board': game.board, 'currentPlayer': game.current_player}
-    
-    def terminal_test_helper(self, state, start_pit, end_pit):
-        """Returns True as long as the terminal state has not been reached.""" 
-        board = state['board']
-        for pit in range(start_pit, end_pit + 1):
-            if board[pit] == 0:
-                continue
-            else:
-                return False
-        return True
+    def random_playout(self, state, rng):
+        """Plays uniformly random moves from state to the end of the game on a single list and
+        returns the final mancala difference for player 1."""
+        board = list(state)
+        slot1, slot2 = self._stones_slot[1], self._stones_slot[2]
+        while board[slot1] and board[slot2]:
+            self.sow(board, rng.choice(self.legal_moves(board)))
+        return board[self._store[1]] - board[self._store[2]]
+
+    def utility(self, state, player):
+        if player == 1:
+            return state[self._store[1]] - state[self._store[2]]
+        return state[self._store[2]] - state[self._store[1]]
 
     def terminal_test(self, state):
         """Return True if this is a final state for the game."""
-        p1_start_pit, p1_end_pit = self.p1_pits_index
-        p2_start_pit, p2_end_pit = self.p2_pits_index
-        return self.terminal_test_helper(state, p1_start_pit, p1_end_pit) or self.terminal_test_helper(state, p2_start_pit, p2_end_pit)
+        return not state[self._stones_slot[1]] or not state[self._stones_slot[2]]
 
     def to_move(self, state):
-        return state['currentPlayer']
-        
+        return state[self._player_slot]
+
 
-def main():
+class AIPlayer(Mancala, MancalaEngine):
+    def __init__(self, pits_per_player=6, stones_per_pit=4):
+        Mancala.__init__(self, pits_per_player, stones_per_pit) #Used to avoid duplication of Mancala Class 
+        MancalaEngine.__init__(self, pits_per_player) #Search protocol (actions/result/terminal_test/utility) comes from the engine
+
+    def getState(self): #helper function
+        return self.state_from_board(self.board, self.current_player) #Compact tuple state, see MancalaEngine
+
+
+def main(stats_file=None, record=None):
+    """Random player vs AI batch run. If stats_file (an open file) is given, the SearchStats of
+    every AI move are written to it as one JSON object per line. Every game is appended to
+    record (a records.GameRecordWriter) if given."""
+    from book import OpeningBook #book.py and endgame.py import this module, so not at the top
+    from endgame import EndgameDatabase
     player1 = 0
     player2 = 0
     turns_taken = []
+    endgame = EndgameDatabase.find(6) #None unless endgame.py has written an endgame_6_<K>.bin
+    book = OpeningBook.find(6, 4) #None unless book.py has written book_6x4.bin
 
     for i in range(1):
         # game = Mancala(pits_per_player=6, stones_per_pit = 4)
         game = AIPlayer(pits_per_player=6, stones_per_pit = 4)
+        table = TranspositionTable() #Kept for the whole game so later moves reuse earlier searches
+        ordering = MoveOrdering(game) #Killer and history tables, also kept for the whole game
+        game.add_observer(ConsoleObserver()) #Prints GAME OVER and the winner, ConsoleObserver(show_board=True) to watch every move
+        if record:
+            game.add_observer(GameRecorder(record))
         # game.display_board()
         while not game.winning_eval():
             # random versus random logic
@@ -381,150 +1098,66 @@ def main():
                 # game.play_turn(action)
 
             #  alpha beta
+               # state = game.getState()
+               # action = alpha_beta_cutoff_search(state, game, 5, None, None, table)
+               # game.play_turn(action)
+
+            #  parallel root split alpha beta, create searcher = ParallelSearch(workers) once before the games
+               # state = game.getState()
+               # action = searcher.search(state, game, 5)
+               # game.play_turn(action)
+
+            #  iterative deepening alpha beta, fixed time per move instead of fixed depth
                state = game.getState()
-               action = alpha_beta_cutoff_search(state, game, 5, None, None)
+               stats = SearchStats() if stats_file else None
+               action = iterative_deepening_search(state, game, AI_TIME_LIMIT, table=table, ordering=ordering, endgame=endgame,
+                                                   stats=stats, pvs=True, book=book)
+               if stats_file:
+                   stats_file.write(json.dumps({'game': i, 'turn': game.turn_number, 'move': action, **stats.to_dict()}) + "\n")
                game.play_turn(action)
 
-        if game.board[game.p1_mancala_index] > game.board[game.p2_mancala_index]:
+        result = game.game_result()
+        if result.winner == 1:
             player1 += 1
-        elif game.board[game.p2_mancala_index] > game.board[game.p1_mancala_index]:
+        elif result.winner == 2:
             player2 += 1
-        turns_taken.append(game.turn_number)
-    print(f"Average number of turns taken: {math.ceil(np.mean(turns_taken))}") # print statement for random versus random
+        turns_taken.append(result.turns)
+    print(f"Average number of turns taken: {math.ceil(sum(turns_taken) / len(turns_taken))}") # print statement for random versus random
     print(f"Player 1 Wins: {player1}")
     print(f"Player 2 Wins: {player2}")
 
-class MancalaUI:
-    def __init__(self, Mancala):
-        self.game = Mancala
-        self.root = tk.Tk()
-        self.root.title("Mancala Game")
-        self.menu()
-    def menu(self):
-        buttonFrame = tk.Frame(self.root)
-        buttonFrame.pack(pady=100)
-        title = tk.Label(self.root, text="Make a Selection!", font = ("Arial", 24, "bold"))
-        title.pack(pady=20)
-        button0 = Button(self.root, text="Player vs Player", command=self.player_vs_player, width = 20, height = 2)
-        button1 = Button(self.root, text="Player vs AI", command=self.player_vs_ai, width = 20, height = 2)
-        button2 = Button(self.root, text="Player vs Random Player", command=self.player_vs_random, width = 20, height = 2)
-        button0.pack()
-        button1.pack()
-        button2.pack()
-
-    def setup_board(self, func):
-        for widget in self.root.winfo_children(): #Clears the initial buttons
-            widget.destroy()
-        self.player = tk.Label(self.root, text=f"Player {self.game.current_player}'s Turn") #Keeps track of current player
-        self.player.pack(pady=10)
-        self.moveLabel = tk.Label(self.root, text="Last Move: None") #Used for AI and Random Player
-        self.moveLabel.pack(pady=5)
-        board_frame = tk.Frame(self.root) 
-        board_frame.pack(pady=20) #Y-axis positioning
-        self.p2_mancala_label = tk.Label(board_frame, text=f"P2-{self.game.board[self.game.p2_mancala_index]}", width=5, height=6, bg="white", fg="black") #P2 Mancala
-        self.p2_mancala_label.grid(row=0, column=0, rowspan=2, padx=10, pady=10)
-        self.p2Buttons = [] #Stores buttons n an array so they can be updated by update_board
-        for i in range(self.game.pits_per_player):
-            index = self.game.p2_pits_index[0] + i
-            stones = self.game.board[index]
-            btn = tk.Button(board_frame, text=f"P2-{stones}", width=5, height=2, command=lambda pit=(self.game.pits_per_player - i): func(pit), state=tk.NORMAL if self.game.current_player == 2 else tk.DISABLED)
-            btn.grid(row=0, column=i+1)
-            self.p2Buttons.append(btn) #Creates the buttons 
-        self.p1Buttons = []
-        for i in range(self.game.pits_per_player):
-            index = self.game.p1_pits_index[0] + i
-            stones = self.game.board[index]
-            btn=tk.Button(board_frame, text=f"P1-{stones}", width=5, height=2, command=lambda pit = i+1: func(pit), state=tk.NORMAL if self.game.current_player == 1 else tk.DISABLED)
-            btn.grid(row=1, column=i+1)
-            self.p1Buttons.append(btn)
-        self.p1_mancala_label = tk.Label(board_frame, text=f"P1-{self.game.board[self.game.p1_mancala_index]}", width=5, height=6, bg="white", fg="black") #P2 Mancala
-        self.p1_mancala_label.grid(row=0, column=self.game.pits_per_player+1, rowspan=2, padx=10, pady=10)
-        quit = tk.Button(self.root, text="Quit", command=self.root.quit)
-        quit.pack(pady=1)
+def __getattr__(name):
+    """MancalaUI moved to ui.py; from main import MancalaUI still works but imports tkinter then."""
+    if name == 'MancalaUI':
+        from ui import MancalaUI
+        return MancalaUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    def play_turn(self, pit):
-        if self.game.valid_move(pit):
-            self.game.play_turn(pit)
-            if self.game.winning_eval(): #Logic check
-                if self.game.board[self.game.p1_mancala_index] > self.game.board[self.game.p2_mancala_index]:
-                    winner = "Player 1"
-                elif self.game.board[self.game.p2_mancala_index] > self.game.board[self.game.p1_mancala_index]:
-                    winner = "Player 2"
-                tk.messagebox.showinfo("Game Over", f"Game Over! {winner} wins!")
-                self.root.quit()
-            else:
-                self.moveLabel.pack_forget() #Hides label because we do not need it is not needed
-                self.update_board()
-        else:
-            tk.messagebox.showerror("Invalid Move", "Please select a valid pit.")
-
-    def update_board(self):
-        p1Start = self.game.p1_pits_index[0] 
-        for i, btn in enumerate(self.p1Buttons): #Returns both index and btn so we can update both dynamical
-            stones = self.game.board[p1Start + i] #Updates player 1's buttons
-            btn.config(text=f"P1-{stones}")
-            btn.config(state=tk.NORMAL if self.game.current_player == 1 else tk.DISABLED) #Disables buttons hen it is not player turn
-        p2End = self.game.p2_pits_index[1]
-        for i, btn in enumerate(self.p2Buttons): #Same thing done here as above but with player 2 index logic
-            stones = self.game.board[p2End - i]
-            btn.config(text=f"P2-{stones}") 
-            btn.config(state=tk.NORMAL if self.game.current_player == 2 else tk.DISABLED)
-        self.p1_mancala_label.config(text=f"P1-{self.game.board[self.game.p1_mancala_index]}") #Updates mancala index
-        self.p2_mancala_label.config(text=f"P2-{self.game.board[self.game.p2_mancala_index]}")
-        self.player.config(text=f"Player {self.game.current_player}'s Turn") #Updates turn
-        self.game.display_board()
-
-    def play_turn_random(self, pit):
-        if self.game.valid_move(pit):
-            self.game.play_turn(pit) #Logic check
-            if self.game.winning_eval():
-                if self.game.board[self.game.p1_mancala_index] > self.game.board[self.game.p2_mancala_index]:
-                    winner = "Player 1"
-                elif self.game.board[self.game.p2_mancala_index] > self.game.board[self.game.p1_mancala_index]:
-                    winner = "Player 2"
-                tk.messagebox.showinfo("Game Over", f"Game Over! {winner} wins!")
-                self.root.quit()
-            else:
-                if self.game.current_player == 2:
-                    pit = self.game.random_move_generator() #Random move logic
-                    self.moveLabel.config(text=f"Last Move Player {self.game.current_player} moved pit {self.game.pits_per_player - pit+1}") #Helps keep track
-                    self.game.play_turn(pit)
-                    self.update_board()
-        else:
-            tk.messagebox.showerror("Invalid Move", "Please select a valid pit.")
- 
-    def play_turn_ai(self, pit):
-        if self.game.valid_move(pit):
-            self.game.play_turn(pit)
-            if self.game.winning_eval(): #Logic check
-                if self.game.board[self.game.p1_mancala_index] > self.game.board[self.game.p2_mancala_index]:
-                    winner = "Player 1"
-                elif self.game.board[self.game.p2_mancala_index] > self.game.board[self.game.p1_mancala_index]:
-                    winner = "Player 2"
-                tk.messagebox.showinfo("Game Over", f"Game Over! {winner} wins!")
-                self.root.quit()
-            else:
-                if self.game.current_player == 2:
-                    state = game.getState()
-                    action = alpha_beta_cutoff_search(state, game, 10, None, None) #AI logic
-                    self.moveLabel.config(text=f"Last Move Player {self.game.current_player} moved pit {self.game.pits_per_player - action+1}")
-                    game.play_turn(action)
-                    self.update_board()
-        else:
-            tk.messagebox.showerror("Invalid Move", "Please select a valid pit.")
-
-    def player_vs_random(self): # Working
-        self.setup_board(self.play_turn_random)
-    def player_vs_ai(self): # Working
-        self.setup_board(self.play_turn_ai)
-    def player_vs_player(self): # Working
-        self.setup_board(self.play_turn)
-    def run(self):
-        self.root.mainloop()
 
 if __name__ == "__main__":
-    #main()
-    # uncomment for UI
-    game = AIPlayer(pits_per_player=6, stones_per_pit = 5)
-    app = MancalaUI(game)
-    app.run()
+    import argparse
+    parser = argparse.ArgumentParser(description="Mancala with an AI player")
+    parser.add_argument("--cli", action="store_true", help="run the random vs AI batch in main() instead of the UI")
+    parser.add_argument("--stats", metavar="FILE", help="with --cli, write search stats for every AI move as JSON lines ('-' for stdout)")
+    parser.add_argument("--record", metavar="FILE", help="append finished games to FILE (see records.py)")
+    args = parser.parse_args()
+    if args.stats and not args.cli:
+        parser.error("--stats needs --cli, the UI does not write search stats")
+    record = GameRecordWriter(args.record) if args.record else None
+    if args.cli:
+        if args.stats == "-":
+            main(sys.stdout, record)
+        elif args.stats:
+            with open(args.stats, "w") as stats_file:
+                main(stats_file, record)
+        else:
+            main(record=record)
+    else:
+        game = AIPlayer(pits_per_player=6, stones_per_pit = 5)
+        if record:
+            game.add_observer(GameRecorder(record))
+        from ui import MancalaUI #Only the UI needs tkinter, so headless users of this module never import it
+        app = MancalaUI(game)
+        app.run()
+    if record:
+        record.close()
@@ -0,0 +1,212 @@
+"""
+Monte Carlo tree search (UCT) agent for Mancala.
+
+MCTS grows a search tree one node per iteration: it walks down the tree picking the child
+with the best UCB1 score, expands one untried move, plays the rest of the game out at random
+on a single list (MancalaEngine.random_playout) and backs the result up the path. It needs no
+evaluation function and can be stopped at any time, either after a number of iterations or
+after a time budget in milliseconds.
+
+The tree is kept between moves: the next search starts from the node of the position
+actually reached (our move, then the opponent's reply) when it was already expanded, so the
+statistics gathered for it are not thrown away.
+
+ParallelMCTS runs root parallel search: one long-lived process per seed grows its own tree
+from the same position, and the visit counts of the root moves are summed.
+
+Works with any MancalaEngine, e.g. AIPlayer:
+    mcts = MCTS(game, time_limit=1000)
+    move = mcts.search(game.getState())
+
+Usage: python mcts.py [--iterations N] [--time MS] [--workers N] [--pits P] [--stones S]
+"""
+import argparse
+import math
+import multiprocessing
+import random
+import time
+from main import AIPlayer, MancalaEngine
+
+
+class Node:
+    __slots__ = ('state', 'parent', 'move', 'player', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, state, parent, move, player, untried):
+        self.state = state
+        self.parent = parent
+        self.move = move
+        self.player = player # the player who made move, wins are counted for them
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+
+class MCTS:
+    """
+    UCT search on a MancalaEngine. The budget is iterations per search, time_limit in
+    milliseconds, or both (whichever runs out first); with neither it defaults to 10000
+    iterations.
+    """
+    def __init__(self, game, iterations=None, time_limit=None, exploration=1.4, seed=None, reuse=True):
+        self.game = game
+        self.iterations = iterations if iterations or time_limit else 10000
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.reuse = reuse
+        self.root = None
+
+    def _new_node(self, state, parent, move):
+        game = self.game
+        untried = [] if game.terminal_test(state) else game.actions(state)
+        self.rng.shuffle(untried)
+        return Node(state, parent, move, 3 - game.to_move(state), untried)
+
+    def _find_root(self, state):
+        """The node for state from the previous search (up to two plies below its root), or a new one."""
+        if self.reuse and self.root is not None:
+            if self.root.state == state:
+                return self.root
+            for child in self.root.children:
+                if child.state == state:
+                    child.parent = None
+                    return child
+                for grandchild in child.children:
+                    if grandchild.state == state:
+                        grandchild.parent = None
+                        return grandchild
+        return self._new_node(state, None, None)
+
+    def iterate(self, root):
+        """One selection, expansion, playout and backpropagation step."""
+        game = self.game
+        c = self.exploration
+        node = root
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.wins / child.visits + c * math.sqrt(log_visits / child.visits))
+        if node.untried:
+            move = node.untried.pop()
+            child = self._new_node(game.make_move(node.state, move), node, move)
+            node.children.append(child)
+            node = child
+        diff = game.random_playout(node.state, self.rng)
+        # Result for player 1, flipped for nodes where player 2 made the move
+        result = 1.0 if diff > 0 else 0.0 if diff < 0 else 0.5
+        while node is not None:
+            node.visits += 1
+            node.wins += result if node.player == 1 else 1.0 - result
+            node = node.parent
+
+    def run(self, state):
+        """Grows the tree for state within the budget and returns its root."""
+        root = self._find_root(state)
+        deadline = time.perf_counter() + self.time_limit / 1000 if self.time_limit else None
+        iterations = self.iterations
+        count = 0
+        while not (iterations and count >= iterations):
+            self.iterate(root)
+            count += 1
+            if deadline and not count & 63 and time.perf_counter() >= deadline:
+                break
+        return root
+
+    def root_statistics(self, state):
+        """{move: (visits, wins)} of the root moves after searching state."""
+        root = self.run(state)
+        self.root = root
+        return {child.move: (child.visits, child.wins) for child in root.children}
+
+    def search(self, state):
+        """Best move for the player to move: the most visited root move."""
+        root = self.run(state)
+        best = max(root.children, key=lambda child: child.visits)
+        self.root = best
+        return best.move
+
+
+def _search_worker(connection, pits_per_player, iterations, time_limit, exploration, seed):
+    """Process of one ParallelMCTS seed: answers every state received with its root statistics.
+    The process keeps a single tree, so it reuses its own subtree from move to move."""
+    mcts = MCTS(MancalaEngine(pits_per_player), iterations, time_limit, exploration, seed)
+    while True:
+        state = connection.recv()
+        if state is None:
+            break
+        connection.send(mcts.root_statistics(state))
+    connection.close()
+
+
+class ParallelMCTS:
+    """
+    Root parallel MCTS. Every seed has its own long-lived process, which searches the same
+    position with its own budget and keeps its tree for the next move, so a time limit is
+    wall clock time for the whole search (with at least as many cores as workers).
+    """
+    def __init__(self, pits_per_player, workers=None, iterations=None, time_limit=None, exploration=1.4, seed=0):
+        self.pits_per_player = pits_per_player
+        self.workers = workers or multiprocessing.cpu_count()
+        self.connections = []
+        self.processes = []
+        for w in range(self.workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_search_worker, daemon=True,
+                                              args=(child, pits_per_player, iterations, time_limit, exploration, seed + w))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def search(self, state):
+        for connection in self.connections:
+            connection.send(state)
+        visits = {}
+        for connection in self.connections:
+            for move, (n, _) in connection.recv().items():
+                visits[move] = visits.get(move, 0) + n
+        return max(visits, key=visits.get)
+
+    def close(self):
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCTS playout speed and move choice from the opening")
+    parser.add_argument("--iterations", type=int, default=None)
+    parser.add_argument("--time", type=int, default=1000, help="milliseconds per search")
+    parser.add_argument("--workers", type=int, default=1, help="more than 1 uses root parallel search")
+    parser.add_argument("--pits", type=int, default=6)
+    parser.add_argument("--stones", type=int, default=4)
+    args = parser.parse_args()
+
+    game = AIPlayer(args.pits, args.stones)
+    state = game.getState()
+    start = time.perf_counter()
+    if args.workers > 1:
+        with ParallelMCTS(args.pits, args.workers, args.iterations, args.time) as mcts:
+            move = mcts.search(state)
+        print(f"{args.workers} workers chose pit {move} in {time.perf_counter() - start:.2f}s")
+    else:
+        mcts = MCTS(game, args.iterations, args.time, seed=0)
+        root = mcts.run(state)
+        elapsed = time.perf_counter() - start
+        print(f"{root.visits} playouts in {elapsed:.2f}s ({root.visits / elapsed:,.0f} playouts/s)")
+        for child in sorted(root.children, key=lambda child: child.move):
+            print(f"  pit {child.move}: {child.visits} visits, win rate {child.wins / child.visits:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Streaming replay and analysis of game records (see records.py).
+
+Every game is replayed on one list with MancalaEngine.sow, which also checks that the record
+is legal, and the statistics of the positions in its first --plies moves are updated: how
+often each move was played there and how the games went on for the player who chose it.
+Only these statistics are kept, so millions of games can be replayed in constant memory
+(apart from the number of distinct early positions).
+
+The output is JSON lines, one position per line with the most played first:
+    {"pits": 6, "stones": 4, "board": [...], "player": 1, "games": 1234,
+     "moves": {"3": {"games": 400, "wins": 210, "ties": 12}, ...}}
+where wins and ties count games won or tied by the player to move. It can seed an opening
+book or the evaluation tuning.
+
+Usage: python replay.py games.txt [more.txt.gz ...] [--plies 8] [--min-games 20] [--output positions.jsonl]
+"""
+import argparse
+import json
+import time
+from main import MancalaEngine
+from records import PIT_OF, read_games
+
+
+class ReplayStats:
+    """Move statistics of the positions in the first plies moves of every game added."""
+    def __init__(self, plies=8):
+        self.plies = plies
+        self.games = 0
+        self.moves = 0
+        self.outcomes = {1: 0, 2: 0, 0: 0}
+        self.positions = {} # (pits, stones, state) -> {pit: [games, wins, ties]}
+        self._engines = {}
+
+    def add(self, pits_per_player, stones_per_pit, moves):
+        """Replays one game from its encoded moves; raises ValueError for an illegal record."""
+        engine = self._engines.get(pits_per_player)
+        if engine is None:
+            engine = self._engines[pits_per_player] = MancalaEngine(pits_per_player)
+        board = list(engine.initial_state(stones_per_pit))
+        seen = []
+        first_pit = engine._first_pit
+        player_slot = engine._player_slot
+        for ply, c in enumerate(moves):
+            pit = PIT_OF.get(c)
+            if pit is None:
+                raise ValueError(f"bad move character {c!r} at ply {ply + 1}")
+            if engine.terminal_test(board):
+                raise ValueError(f"move after the end of the game at ply {ply + 1}")
+            player = board[player_slot]
+            if not 1 <= pit <= pits_per_player or not board[first_pit[player] + pit - 1]:
+                raise ValueError(f"illegal move {pit} at ply {ply + 1}")
+            if ply < self.plies:
+                seen.append((tuple(board), player, pit))
+            engine.sow(board, pit)
+        if not engine.terminal_test(board):
+            raise ValueError("game record ends before the game does")
+
+        diff = engine.utility(board, 1)
+        winner = 1 if diff > 0 else 2 if diff < 0 else 0
+        self.games += 1
+        self.moves += len(moves)
+        self.outcomes[winner] += 1
+        for state, player, pit in seen:
+            moves_here = self.positions.setdefault((pits_per_player, stones_per_pit, state), {})
+            counts = moves_here.get(pit)
+            if counts is None:
+                counts = moves_here[pit] = [0, 0, 0]
+            counts[0] += 1
+            counts[1] += winner == player
+            counts[2] += winner == 0
+
+    def rows(self, min_games=1):
+        """Output records of the positions played at least min_games times, most played first."""
+        rows = []
+        for (pits, stones, state), moves in self.positions.items():
+            games = sum(counts[0] for counts in moves.values())
+            if games >= min_games:
+                rows.append({'pits': pits, 'stones': stones, 'board': list(state[:2 * pits + 2]), 'player': state[2 * pits + 2],
+                             'games': games,
+                             'moves': {str(pit): {'games': n, 'wins': w, 'ties': t} for pit, (n, w, t) in sorted(moves.items())}})
+        rows.sort(key=lambda row: row['games'], reverse=True)
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay game records and collect per position move statistics")
+    parser.add_argument("files", nargs='+')
+    parser.add_argument("--plies", type=int, default=8, help="collect statistics for the first PLIES moves of every game")
+    parser.add_argument("--min-games", type=int, default=20, help="only output positions played at least this often")
+    parser.add_argument("--output", default="positions.jsonl")
+    args = parser.parse_args()
+
+    stats = ReplayStats(args.plies)
+    start = time.perf_counter()
+    for path in args.files:
+        for number, (pits, stones, _, moves) in enumerate(read_games(path), 1):
+            try:
+                stats.add(pits, stones, moves)
+            except ValueError as e:
+                raise SystemExit(f"{path}: game {number}: {e}")
+    elapsed = time.perf_counter() - start
+
+    rows = stats.rows(args.min_games)
+    with open(args.output, 'w') as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+    print(f"{stats.games:,} games, {stats.moves:,} moves in {elapsed:.2f}s ({stats.games / elapsed:,.0f} games/s)")
+    print(f"Player 1 Wins: {stats.outcomes[1]}, Player 2 Wins: {stats.outcomes[2]}, Ties: {stats.outcomes[0]}")
+    print(f"{len(stats.positions):,} positions in the first {args.plies} plies, {len(rows):,} played at least "
+          f"{args.min_games} times written to {args.output}")
+    for row in rows[:3]:
+        best = max(row['moves'].items(), key=lambda item: item[1]['wins'] / item[1]['games'])
+        print(f"  {row['games']} games at {row['board']} (player {row['player']}), best pit {best[0]} "
+              f"wins {best[1]['wins'] / best[1]['games']:.1%} of {best[1]['games']}")
+
+
+if __name__ == "__main__":
+    main()
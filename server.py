@@ -0,0 +1,308 @@
+"""
+Game server: many concurrent Mancala games over a local TCP socket.
+
+The protocol is JSON lines: every request is one JSON object on a line and gets exactly one
+JSON object back, carrying the request's "id" if it had one. Requests of a connection are
+answered in order, one at a time, so a client that sends faster than it is served is slowed
+down by TCP itself. Games (sessions) belong to the connection that created them.
+
+    {"op": "new", "pits": 6, "stones": 4}         -> {"session": 1, "state": {...}}
+    {"op": "move", "session": 1, "pit": 3}        -> {"state": {...}}
+    {"op": "ai", "session": 1, "time_ms": 200}    -> {"move": 5, "state": {...}}
+    {"op": "state", "session": 1}                 -> {"state": {...}}
+    {"op": "close", "session": 1}                 -> {"closed": 1}
+    {"op": "metrics"}                             -> {"metrics": {...}}
+
+A state is {"board": [...], "player": 1, "over": false, "winner": null}, the board laid out
+like Mancala.board and winner 1, 2 or 0 for a tie once the game is over. Errors come back
+as {"error": "..."}.
+
+"ai" plays the AI's move for the player to move: iterative_deepening_search runs on a
+process pool so the event loop never blocks, answering from the opening book for the board
+size if book.py has written one. time_ms is the budget for the whole request,
+queueing included, clamped to 1..--max-time. When --max-pending AI requests are already queued
+or running the request is refused with {"error": "busy", "retry_ms": ...} instead of
+queueing without bound.
+
+Usage: python server.py [--port 7878] [--workers N] [--max-pending N] [--record games.txt]
+See loadgen.py for a load generator.
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import logging
+import math
+import multiprocessing
+import time
+from book import OpeningBook
+from main import AIPlayer, MoveOrdering, TranspositionTable, iterative_deepening_search
+from records import GameRecordWriter
+
+OPS = ('new', 'move', 'ai', 'state', 'close', 'metrics')
+TABLE_ENTRIES = 50000 # per board size in every pool process (~15 MB); longer searches evict the oldest entries
+logger = logging.getLogger(__name__)
+_worker_games = {} # (pits, stones) -> (AIPlayer, TranspositionTable, MoveOrdering, OpeningBook or None), per pool process
+
+
+def _ai_move(pits, stones, state, deadline):
+    """Pool task: the AI move for state, searched until deadline (a time.time() value)."""
+    search = _worker_games.get((pits, stones))
+    if search is None:
+        game = AIPlayer(pits, stones)
+        search = _worker_games[(pits, stones)] = (game, TranspositionTable(TABLE_ENTRIES), MoveOrdering(game),
+                                                  OpeningBook.find(pits, stones))
+    game, table, ordering, book = search
+    time_limit = max((deadline - time.time()) * 1000, 1)
+    return iterative_deepening_search(state, game, time_limit, table=table, ordering=ordering, pvs=True, book=book)
+
+
+class Session:
+    def __init__(self, game, stones_per_pit):
+        self.game = game # shared AIPlayer of the board size, only used through its state protocol
+        self.stones_per_pit = stones_per_pit
+        self.state = game.initial_state(stones_per_pit)
+        self.moves = []
+
+    def play(self, pit):
+        self.state = self.game.result(self.state, pit)
+        self.moves.append(pit)
+
+    def to_dict(self):
+        game = self.game
+        board = list(self.state[:2 * game.pits_per_player + 2])
+        over = game.terminal_test(self.state)
+        winner = None
+        if over:
+            diff = game.utility(self.state, 1)
+            winner = 1 if diff > 0 else 2 if diff < 0 else 0
+        return {'board': board, 'player': game.to_move(self.state), 'over': over, 'winner': winner}
+
+
+class ServerMetrics:
+    """Request counts and latencies per op; percentiles are over the last samples requests."""
+    def __init__(self, samples=10000):
+        self.start = time.perf_counter()
+        self.counts = collections.Counter()
+        self.errors = collections.Counter()
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=samples))
+        self.rejected = 0
+        self.in_flight = 0
+        self.sessions = 0
+
+    def record(self, op, seconds, error=False):
+        self.counts[op] += 1
+        if error:
+            self.errors[op] += 1
+        self.latencies[op].append(seconds)
+
+    def to_dict(self):
+        elapsed = time.perf_counter() - self.start
+        ops = {}
+        for op, count in self.counts.items():
+            latencies = sorted(self.latencies[op])
+            ops[op] = {'count': count, 'errors': self.errors[op],
+                       'mean_ms': 1000 * sum(latencies) / len(latencies),
+                       'p50_ms': 1000 * latencies[len(latencies) // 2],
+                       'p95_ms': 1000 * latencies[int(len(latencies) * 0.95)],
+                       'p99_ms': 1000 * latencies[int(len(latencies) * 0.99)]}
+        total = sum(self.counts.values())
+        return {'uptime': elapsed, 'requests': total, 'requests_per_second': total / elapsed if elapsed else 0.0,
+                'rejected': self.rejected, 'ai_in_flight': self.in_flight, 'sessions': self.sessions, 'ops': ops}
+
+
+class RequestError(Exception):
+    def __init__(self, message, **extra):
+        super().__init__(message)
+        self.extra = extra
+
+
+def integer_field(request, name, default, low, high):
+    """request[name] (default if missing), which has to be a JSON integer from low to high."""
+    value = request.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+        raise RequestError(f"{name} must be an integer from {low} to {high}")
+    return value
+
+
+class GameServer:
+    def __init__(self, workers=None, max_pending=None, max_time=2000, default_time=200, max_sessions=10000, record=None):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_pending = max_pending or 4 * self.workers
+        self.max_time = max_time
+        self.default_time = default_time
+        self.max_sessions = max_sessions
+        self.record = record
+        self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+        self.metrics = ServerMetrics()
+        self.games = {} # (pits, stones) -> AIPlayer
+        self.sessions = {}
+        self.next_session = 1
+
+    def session(self, request, owned):
+        sid = request.get('session')
+        if isinstance(sid, bool) or not isinstance(sid, int) or sid not in owned:
+            raise RequestError(f"no session {sid}")
+        return self.sessions[sid]
+
+    async def handle(self, request, owned):
+        op = request.get('op')
+        if op == 'new':
+            pits = integer_field(request, 'pits', 6, 1, 35)
+            stones = integer_field(request, 'stones', 4, 1, 20)
+            if len(self.sessions) >= self.max_sessions:
+                raise RequestError("too many sessions")
+            game = self.games.get((pits, stones))
+            if game is None:
+                game = self.games[(pits, stones)] = AIPlayer(pits, stones)
+            sid = self.next_session
+            self.next_session += 1
+            self.sessions[sid] = Session(game, stones)
+            owned.add(sid)
+            self.metrics.sessions = len(self.sessions)
+            return {'session': sid, 'state': self.sessions[sid].to_dict()}
+        if op == 'move':
+            session = self.session(request, owned)
+            pit = request.get('pit')
+            if (isinstance(pit, bool) or not isinstance(pit, int) or session.game.terminal_test(session.state)
+                    or pit not in session.game.actions(session.state)):
+                raise RequestError(f"illegal move {pit}")
+            session.play(pit)
+            self.finished(session)
+            return {'state': session.to_dict()}
+        if op == 'ai':
+            session = self.session(request, owned)
+            if session.game.terminal_test(session.state):
+                raise RequestError("game is over")
+            if self.metrics.in_flight >= self.max_pending:
+                self.metrics.rejected += 1
+                raise RequestError("busy", retry_ms=self.default_time)
+            budget = request.get('time_ms', self.default_time)
+            if isinstance(budget, bool) or not isinstance(budget, (int, float)) or not math.isfinite(budget):
+                raise RequestError("time_ms must be a finite number")
+            budget = min(max(budget, 1), self.max_time)
+            deadline = time.time() + budget / 1000
+            state = session.state
+            self.metrics.in_flight += 1
+            pool = self.pool
+            try:
+                move = await asyncio.get_running_loop().run_in_executor(
+                    pool, _ai_move, session.game.pits_per_player, session.stones_per_pit, state, deadline)
+            except concurrent.futures.process.BrokenProcessPool:
+                # A worker died (killed, out of memory): start a new pool, once, so later requests work again
+                if self.pool is pool:
+                    pool.shutdown(wait=False)
+                    self.pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+                raise
+            finally:
+                self.metrics.in_flight -= 1
+            if session.state != state: # closed or moved meanwhile, which a serial connection cannot do
+                raise RequestError("session changed during the search")
+            session.play(move)
+            self.finished(session)
+            return {'move': move, 'state': session.to_dict()}
+        if op == 'state':
+            return {'state': self.session(request, owned).to_dict()}
+        if op == 'close':
+            self.session(request, owned)
+            self.close_session(request['session'], owned)
+            return {'closed': request['session']}
+        if op == 'metrics':
+            return {'metrics': self.metrics.to_dict()}
+        raise RequestError(f"unknown op {op!r}")
+
+    def finished(self, session):
+        if self.record and session.game.terminal_test(session.state):
+            self.record.write(session.game.pits_per_player, session.stones_per_pit, None, session.moves)
+
+    def close_session(self, sid, owned):
+        owned.discard(sid)
+        self.sessions.pop(sid, None)
+        self.metrics.sessions = len(self.sessions)
+
+    async def connection(self, reader, writer):
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                request = {}
+                error = False
+                try:
+                    parsed = json.loads(line)
+                    if not isinstance(parsed, dict):
+                        raise RequestError("request must be a JSON object")
+                    request = parsed
+                    response = await self.handle(request, owned)
+                except (RequestError, ValueError) as e:
+                    error = True
+                    response = {'error': str(e), **getattr(e, 'extra', {})}
+                except Exception as e: # a bug or a broken pool must not drop the connection and its sessions
+                    logger.exception("request %r failed", line)
+                    error = True
+                    response = {'error': f"internal error: {type(e).__name__}"}
+                if 'id' in request:
+                    response['id'] = request['id']
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+                op = request.get('op')
+                self.metrics.record(op if op in OPS else 'invalid', time.perf_counter() - start, error)
+        except ConnectionError:
+            pass
+        finally:
+            for sid in list(owned):
+                self.close_session(sid, owned)
+            writer.close()
+
+    async def report(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            m = self.metrics.to_dict()
+            ai = m['ops'].get('ai')
+            ai_text = f", ai p50 {ai['p50_ms']:.0f} ms p95 {ai['p95_ms']:.0f} ms" if ai else ""
+            print(f"{m['requests']} requests ({m['requests_per_second']:.0f}/s), {m['sessions']} sessions, "
+                  f"{m['ai_in_flight']} ai in flight, {m['rejected']} rejected{ai_text}", flush=True)
+            if self.record:
+                self.record.flush()
+
+    async def serve(self, host, port, report=10):
+        server = await asyncio.start_server(self.connection, host, port)
+        print(f"serving on {host}:{port} with {self.workers} workers", flush=True)
+        reporter = asyncio.create_task(self.report(report)) if report else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if reporter:
+                reporter.cancel()
+            self.pool.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mancala game server (JSON lines over TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="AI search processes")
+    parser.add_argument("--max-pending", type=int, default=None, help="AI requests queued or running before refusing (default 4 per worker)")
+    parser.add_argument("--max-time", type=int, default=2000, help="cap on time_ms of an AI request")
+    parser.add_argument("--default-time", type=int, default=200, help="time_ms of an AI request that does not give one")
+    parser.add_argument("--report", type=float, default=10, help="seconds between metrics lines, 0 for none")
+    parser.add_argument("--record", metavar="FILE", help="append finished games to FILE (see records.py)")
+    args = parser.parse_args()
+
+    record = GameRecordWriter(args.record) if args.record else None
+    server = GameServer(args.workers, args.max_pending, args.max_time, args.default_time, record=record)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.report))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if record:
+            record.close()
+
+
+if __name__ == "__main__":
+    main()
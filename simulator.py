@@ -0,0 +1,160 @@
+"""
+Batched self-play simulator: plays many Mancala games at once on NumPy arrays.
+
+All boards live in one (N, 2*(pits+1)) array laid out like Mancala.board, and every step
+plays one move in each unfinished game. The rules are the same as Mancala.play_turn:
+sowing skips the opponent's mancala, ending in an empty pit of your own row captures it and
+the opposite pit, there are no extra turns, and the game ends as soon as one row is empty,
+with the winner decided by the mancala counts alone.
+
+Usage: python simulator.py [--games N] [--pits P] [--stones S] [--seed SEED] [--record FILE]
+"""
+import argparse
+import time
+import numpy as np
+from records import ALPHABET, GameRecordWriter
+
+
+def random_policy(sim, boards, players, legal, rng):
+    """Picks a uniformly random legal pit (0 based) for every game."""
+    return np.argmax(rng.random(legal.shape) * legal, axis=1)
+
+
+class BatchSimulator:
+    def __init__(self, pits_per_player=6, stones_per_pit=4):
+        p = pits_per_player
+        self.pits_per_player = p
+        self.stones_per_pit = stones_per_pit
+        self.board_size = (p + 1) * 2
+        self.cycle = self.board_size - 1 # sowing skips the opponent's mancala
+        self.first_pit = np.array([0, p + 1]) # indexed by player - 1
+        self.store = np.array([p, 2 * p + 1])
+
+        # path[player, pit, k] is the board index receiving the (k+1)th stone sown from pit,
+        # distance[player, pit, i] is the position of board index i on that path (0 if never sown into)
+        self.path = np.zeros((2, self.board_size, self.cycle), dtype=np.int64)
+        self.distance = np.zeros((2, self.board_size, self.board_size), dtype=np.int64)
+        for player in (0, 1):
+            skip = self.store[1 - player]
+            for index in range(self.first_pit[player], self.first_pit[player] + p):
+                i = index
+                k = 0
+                while k < self.cycle:
+                    i = (i + 1) % self.board_size
+                    if i == skip:
+                        continue
+                    self.path[player, index, k] = i
+                    self.distance[player, index, i] = k + 1
+                    k += 1
+
+    def new_boards(self, games):
+        boards = np.full((games, self.board_size), self.stones_per_pit, dtype=np.int64)
+        boards[:, self.store] = 0
+        return boards
+
+    def legal_moves(self, boards, players):
+        """Mask of legal pits (0 based) for the player to move in each game."""
+        rows = self.first_pit[players - 1][:, None] + np.arange(self.pits_per_player)
+        return np.take_along_axis(boards, rows, axis=1) > 0
+
+    def finished(self, boards):
+        p = self.pits_per_player
+        return ~boards[:, :p].any(axis=1) | ~boards[:, p + 1:2 * p + 1].any(axis=1)
+
+    def step(self, boards, players, pits):
+        """Plays pit (0 based, must be legal) in every game, in place. Returns the capture mask."""
+        n = len(boards)
+        rows = np.arange(n)
+        side = players - 1
+        index = self.first_pit[side] + pits
+        stones = boards[rows, index]
+        boards[rows, index] = 0
+        laps, rest = np.divmod(stones, self.cycle)
+        distance = self.distance[side, index]
+        sown = distance > 0
+        boards += laps[:, None] * sown + (sown & (distance <= rest[:, None]))
+        last = self.path[side, index, rest - 1] # rest == 0 means a full lap ending on path[-1]
+
+        # Capture conditions, same as Mancala.play_turn
+        own_row = (last >= self.first_pit[side]) & (last < self.first_pit[side] + self.pits_per_player)
+        capture = own_row & (boards[rows, last] == 1)
+        if capture.any():
+            r = rows[capture]
+            last = last[capture]
+            opposite = 2 * self.pits_per_player - last
+            boards[r, self.store[side[capture]]] += boards[r, opposite] + 1
+            boards[r, opposite] = 0
+            boards[r, last] = 0
+        players[:] = 3 - players
+        return capture
+
+    def run(self, games, policy1=random_policy, policy2=random_policy, seed=None, record=None):
+        """
+        Plays games games to the end. Returns (turns, outcomes, boards) where outcomes holds
+        1 or 2 for the winner and 0 for a tie. With record (a records.GameRecordWriter) every
+        game is appended to it, with seed in the header.
+        """
+        rng = np.random.default_rng(seed)
+        boards = self.new_boards(games)
+        players = np.ones(games, dtype=np.int64)
+        turns = np.zeros(games, dtype=np.int64)
+        live = np.flatnonzero(~self.finished(boards))
+        steps = [] # (live games, pits) of every step, only kept for record
+        while len(live):
+            live_boards = boards[live]
+            live_players = players[live]
+            legal = self.legal_moves(live_boards, live_players)
+            pits = np.empty(len(live), dtype=np.int64)
+            for player, policy in ((1, policy1), (2, policy2)):
+                mine = live_players == player
+                if mine.any():
+                    pits[mine] = policy(self, live_boards[mine], live_players[mine], legal[mine], rng)
+            if record:
+                steps.append((live, pits))
+            self.step(live_boards, live_players, pits)
+            boards[live] = live_boards
+            players[live] = live_players
+            turns[live] += 1
+            live = live[~self.finished(live_boards)]
+        p1 = boards[:, self.store[0]]
+        p2 = boards[:, self.store[1]]
+        outcomes = np.where(p1 > p2, 1, np.where(p2 > p1, 2, 0))
+        if record:
+            self.write_records(record, steps, turns, seed)
+        return turns, outcomes, boards
+
+    def write_records(self, record, steps, turns, seed):
+        # Every live game moves once per step, so step t is move t of each game in it
+        moves = np.zeros((len(turns), len(steps)), dtype=np.uint8)
+        for t, (live, pits) in enumerate(steps):
+            moves[live, t] = pits + 1
+        characters = np.frombuffer(ALPHABET.encode(), dtype=np.uint8)[moves]
+        for g in range(len(turns)):
+            record.write(self.pits_per_player, self.stones_per_pit, seed, characters[g, :turns[g]].tobytes().decode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched random vs random Mancala games")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--pits", type=int, default=6)
+    parser.add_argument("--stones", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=109)
+    parser.add_argument("--record", metavar="FILE", help="append the games to FILE (see records.py)")
+    args = parser.parse_args()
+
+    sim = BatchSimulator(args.pits, args.stones)
+    record = GameRecordWriter(args.record) if args.record else None
+    start = time.perf_counter()
+    turns, outcomes, _ = sim.run(args.games, seed=args.seed, record=record)
+    elapsed = time.perf_counter() - start
+    if record:
+        record.close()
+    print(f"Games: {args.games} in {elapsed:.2f}s ({args.games / elapsed:,.0f} games/s)")
+    print(f"Average number of turns taken: {turns.mean():.1f}")
+    print(f"Player 1 Wins: {(outcomes == 1).sum()}")
+    print(f"Player 2 Wins: {(outcomes == 2).sum()}")
+    print(f"Ties: {(outcomes == 0).sum()}")
+
+
+if __name__ == "__main__":
+    main()
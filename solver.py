@@ -0,0 +1,248 @@
+"""
+Exact solver for small Mancala boards (for example 3 or 4 pits with 2 to 4 stones).
+
+Like the endgame database, the value of a position only depends on the stones still in the
+pits and on who is to move: the mancalas never give stones back. Solver computes the number
+of stones the player to move gains over the opponent from here on with perfect play by
+memoized negamax over every reachable pit configuration, without pruning, so every value in
+the memo is exact and can be reused by any later position.
+
+Solved configurations are appended to a cache file as they are found, so an interrupted solve
+picks up where it stopped. The file holds every solved position for one pits_per_player,
+whatever the number of stones: a 16 byte header (magic, version, pits_per_player) followed by
+records of 2 * pits_per_player bytes of pit counts, seen from the player to move, and one
+signed byte of value.
+
+solve() splits the work over a process pool: the distinct positions a few plies after the
+start are solved by the workers, which pick up each other's results from the cache file
+before every task, and the start position is then solved on top of them.
+
+Solver has the same value() and best_move() as EndgameDatabase, so it can be passed as
+endgame= to alpha_beta_cutoff_search or iterative_deepening_search for perfect play.
+
+Usage: python solver.py --pits 4 --stones 3 [--workers N] [--validate DEPTH]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import struct
+import time
+from main import AIPlayer, MancalaEngine, alpha_beta_cutoff_search
+
+MAGIC = b'MANCSOLV'
+VERSION = 1
+HEADER = struct.Struct('<8sHHxxxx')
+FLUSH_EVERY = 100000 # new values kept in memory before they are appended to the cache file
+
+
+class Solver:
+    """
+    Memoized negamax solver. Values are solved on demand, so value() and best_move() work for
+    any position, quickly once the cache holds it. path is the cache file, created if missing.
+    """
+    def __init__(self, pits_per_player, path=None):
+        self.pits_per_player = pits_per_player
+        self.path = path
+        self.values = {} # pit counts seen from the player to move (bytes) -> future gain
+        self._engine = MancalaEngine(pits_per_player)
+        self._record = struct.Struct(f'<{2 * pits_per_player}sb')
+        self._pending = []
+        self._open = set()
+        self._loaded = {} # bytes of each cache file already read
+        if path is not None:
+            if os.path.exists(path):
+                self.load(path)
+            else:
+                with open(path, 'wb') as f:
+                    f.write(HEADER.pack(MAGIC, VERSION, pits_per_player))
+
+    def load(self, path):
+        """Adds the values of a cache file; called again, only the records appended since are read."""
+        offset = self._loaded.get(path)
+        with open(path, 'rb') as f:
+            if offset is None:
+                magic, version, pits = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC or version != VERSION or pits != self.pits_per_player:
+                    raise ValueError(f"{path} is not a version {VERSION} solver cache for {self.pits_per_player} pits")
+                offset = HEADER.size
+            f.seek(offset)
+            data = f.read()
+        end = len(data) - len(data) % self._record.size # ignore a record cut off by an interruption
+        for key, value in self._record.iter_unpack(data[:end]):
+            self.values.setdefault(key, value)
+        self._loaded[path] = offset + end
+
+    def add(self, key, value):
+        if key not in self.values:
+            self.values[key] = value
+            self._pending.append((key, value))
+
+    def take_pending(self):
+        """The values solved since the last call (and not yet written)."""
+        pending, self._pending = self._pending, []
+        return pending
+
+    def flush(self):
+        if self.path is None:
+            self._pending = []
+            return
+        data = b''.join(self._record.pack(key, value) for key, value in self.take_pending())
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        if self._loaded.get(self.path) is not None:
+            self._loaded[self.path] += len(data)
+
+    def gain(self, key):
+        """Future gain of the player to move for the pit counts key (own row first)."""
+        value = self.values.get(key)
+        if value is not None:
+            return value
+        p = self.pits_per_player
+        engine = self._engine
+        state = engine.state_from_board(list(key[:p]) + [0] + list(key[p:]) + [0], 1)
+        best = 0
+        if not engine.terminal_test(state):
+            if key in self._open:
+                raise ValueError("cycle in the game graph")
+            self._open.add(key)
+            best = None
+            for pit in engine.legal_moves(state):
+                child = engine.make_move(state, pit)
+                value = child[p] - self.gain(bytes(child[p + 1:2 * p + 1] + child[:p]))
+                if best is None or value > best:
+                    best = value
+            self._open.discard(key)
+        self.add(key, best)
+        if len(self._pending) >= FLUSH_EVERY and self.path is not None:
+            self.flush()
+        return best
+
+    def key(self, state):
+        p = self.pits_per_player
+        if self._engine.to_move(state) == 1:
+            return bytes(state[:p] + state[p + 1:2 * p + 1])
+        return bytes(state[p + 1:2 * p + 1] + state[:p])
+
+    def future_gain(self, state):
+        """Stones the player to move gains over the opponent from state on."""
+        return self.gain(self.key(state))
+
+    def value(self, state, player):
+        """Exact final mancala difference for player (same units as AIPlayer.utility)."""
+        p = self.pits_per_player
+        diff = state[p] - state[2 * p + 1]
+        if player == 2:
+            diff = -diff
+        gain = self.future_gain(state)
+        return diff + gain if self._engine.to_move(state) == player else diff - gain
+
+    def best_move(self, state):
+        """(move, exact value for the player to move), or None at the end of the game."""
+        engine = self._engine
+        if engine.terminal_test(state):
+            return None
+        player = engine.to_move(state)
+        best = None
+        for move in engine.actions(state):
+            v = self.value(engine.make_move(state, move), player)
+            if best is None or v > best[1]:
+                best = (move, v)
+        return best
+
+    def close(self):
+        self.flush()
+
+
+_worker_solver = None
+_worker_path = None
+
+
+def _init_worker(pits_per_player, path):
+    global _worker_solver, _worker_path
+    _worker_solver = Solver(pits_per_player)
+    _worker_path = path
+
+
+def _solve_key(key):
+    """Worker task: solves one position and returns every value it had to solve for it.
+    Values the other workers found in the meantime are read from the cache file first."""
+    _worker_solver.load(_worker_path)
+    _worker_solver.gain(key)
+    return _worker_solver.take_pending()
+
+
+def split(solver, state, plies):
+    """The distinct unsolved positions (as keys) plies moves after state."""
+    engine = solver._engine
+    frontier = {state}
+    for _ in range(plies):
+        frontier = {engine.make_move(s, move) for s in frontier if not engine.terminal_test(s) for move in engine.actions(s)}
+    return list(dict.fromkeys(key for key in map(solver.key, frontier) if key not in solver.values))
+
+
+def solve(pits_per_player, stones_per_pit, path, workers=1, split_plies=6):
+    """Solves the start position of the board, returning the Solver and (best move, value for player 1).
+    With more than one worker, the positions split_plies moves in are solved on a process pool,
+    which shares its results through the cache file at path."""
+    solver = Solver(pits_per_player, path)
+    state = AIPlayer(pits_per_player, stones_per_pit).getState()
+    try:
+        if workers > 1:
+            keys = split(solver, state, split_plies)
+            with multiprocessing.Pool(workers, _init_worker, (pits_per_player, path)) as pool:
+                for values in pool.imap_unordered(_solve_key, keys):
+                    for key, value in values:
+                        solver.add(key, value)
+                    solver.flush()
+        return solver, solver.best_move(state)
+    finally:
+        solver.flush()
+
+
+def validate(solver, game, depth, positions, seed=0):
+    """Share of positions from random games where alpha-beta at depth picks a move with the perfect value."""
+    rng = random.Random(seed)
+    state = game.getState()
+    correct = total = 0
+    while total < positions:
+        if game.terminal_test(state):
+            state = game.getState()
+            continue
+        if len(game.actions(state)) > 1:
+            player = game.to_move(state)
+            best = solver.best_move(state)[1]
+            move = alpha_beta_cutoff_search(state, game, depth)
+            correct += solver.value(game.result(state, move), player) == best
+            total += 1
+        state = game.result(state, rng.choice(game.actions(state)))
+    return correct / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve small Mancala boards exactly")
+    parser.add_argument("--pits", type=int, default=4)
+    parser.add_argument("--stones", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--split", type=int, default=6, help="plies from the start where the work is split")
+    parser.add_argument("--output", default="solve_{pits}.bin", help="cache file, shared by every stone count")
+    parser.add_argument("--validate", type=int, default=None, metavar="DEPTH", help="check alpha-beta at DEPTH against perfect play")
+    parser.add_argument("--positions", type=int, default=1000)
+    args = parser.parse_args()
+
+    path = args.output.format(pits=args.pits)
+    start = time.perf_counter()
+    before = len(Solver(args.pits, path).values) if os.path.exists(path) else 0
+    solver, (move, value) = solve(args.pits, args.stones, path, args.workers, args.split)
+    elapsed = time.perf_counter() - start
+    outcome = f"wins by {value}" if value > 0 else f"loses by {-value}" if value < 0 else "ties"
+    print(f"{args.pits}x{args.stones}: player 1 {outcome} with perfect play, best first move pit {move}")
+    print(f"{len(solver.values):,} positions solved ({len(solver.values) - before:,} new) in {elapsed:.1f}s, "
+          f"cache {path} {os.path.getsize(path):,} bytes")
+    if args.validate is not None:
+        rate = validate(solver, AIPlayer(args.pits, args.stones), args.validate, args.positions)
+        print(f"alpha-beta depth {args.validate} plays a perfect move in {rate:.1%} of {args.positions} positions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Rule equivalence tests: Mancala.play_turn, MancalaEngine.make_move and BatchSimulator.step
+must play the same games, and the search options must not change alpha-beta scores.
+
+Run with: python -m pytest -q
+"""
+import random
+import pytest
+from main import AIPlayer, Mancala, MoveOrdering, alpha_beta_cutoff_search
+
+BOARDS = [(6, 4), (4, 3), (3, 9)] # 3x9 sows full laps
+SEEDS = range(50)
+
+
+def random_game(pits, stones, seed):
+    """Plays a seeded random game on a Mancala and on an engine state, yielding
+    (Mancala, engine, state, next move) before every move and with move None at the end."""
+    rng = random.Random(seed)
+    game = Mancala(pits, stones)
+    engine = AIPlayer(pits, stones)
+    state = engine.getState()
+    while not engine.terminal_test(state):
+        pit = rng.choice(engine.actions(state))
+        yield game, engine, state, pit
+        game.play_turn(pit)
+        state = engine.make_move(state, pit)
+    yield game, engine, state, None
+
+
+@pytest.mark.parametrize("pits, stones", BOARDS)
+def test_engine_plays_like_mancala(pits, stones):
+    for seed in SEEDS:
+        for game, engine, state, pit in random_game(pits, stones, seed):
+            assert list(state[:2 * pits + 2]) == game.board
+            assert engine.to_move(state) == game.current_player
+            assert state == engine.state_from_board(game.board, game.current_player) # bitmask and stone totals kept up to date
+            assert engine.terminal_test(state) == game.is_game_over()
+            if pit is not None:
+                assert engine.actions(state) == [move for move in range(1, pits + 1) if game.valid_move(move)]
+
+
+@pytest.mark.parametrize("pits, stones", BOARDS)
+def test_batch_simulator_plays_like_mancala(pits, stones):
+    np = pytest.importorskip("numpy")
+    from simulator import BatchSimulator
+    sim = BatchSimulator(pits, stones)
+    for seed in SEEDS:
+        boards = sim.new_boards(1)
+        players = np.ones(1, dtype=np.int64)
+        for game, engine, state, pit in random_game(pits, stones, seed):
+            assert boards[0].tolist() == game.board
+            assert players[0] == game.current_player
+            assert sim.finished(boards)[0] == game.is_game_over()
+            if pit is not None:
+                legal = sim.legal_moves(boards, players)[0]
+                assert [int(i) + 1 for i in np.flatnonzero(legal)] == engine.actions(state)
+                sim.step(boards, players, np.array([pit - 1]))
+
+
+@pytest.mark.parametrize("pits, stones", BOARDS)
+def test_search_options_keep_the_score(pits, stones):
+    game = AIPlayer(pits, stones)
+    rng = random.Random(pits * stones)
+    positions = []
+    while len(positions) < 8:
+        state = game.getState()
+        for _ in range(rng.randrange(12)):
+            if game.terminal_test(state):
+                break
+            state = game.result(state, rng.choice(game.actions(state)))
+        if not game.terminal_test(state):
+            positions.append(state)
+    for state in positions:
+        _, score = alpha_beta_cutoff_search(state, game, 5, with_score=True)
+        for pvs in (False, True):
+            for ordering in (None, MoveOrdering(game)):
+                assert alpha_beta_cutoff_search(state, game, 5, with_score=True, ordering=ordering, pvs=pvs)[1] == score
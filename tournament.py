@@ -0,0 +1,272 @@
+"""
+Tournament runner: plays every pairing of the chosen agents on every board size.
+
+Games are spread over a process pool and each result is appended to the output file
+(JSON lines, or CSV if the name ends in .csv) as soon as it finishes, so a long run can be
+watched with tail -f. Running the same command again skips the games already in the file;
+a last line cut off by a killed run is dropped first.
+
+Every game starts with --opening-plies random moves drawn from its seed (recorded in the
+result's opening field, encoded as in records.py), so games between deterministic agents
+differ from seed to seed and the win rate confidence intervals are over different games.
+
+Agents are given as strings:
+    random              uniformly random legal move
+    minimax:K           minmax_decision at depth K
+    alphabeta:K         alpha_beta_cutoff_search at depth K with a per game transposition table
+    id:MS               iterative_deepening_search with MS milliseconds per move
+Both play from the opening book of the board size (see book.py) while the game is in it.
+    eval:K[:FILE]       alpha_beta_cutoff_search at depth K with WeightedEvaluation, weights from FILE (see tune.py)
+    mcts:N / mcts:MSms  MCTS with N iterations or MS milliseconds per move, keeping its tree between moves
+    module:function     any function without arguments returning an agent, e.g. mybots:make_greedy
+
+An agent has new_game(game, rng) and move(game, state) -> pit.
+
+Usage: python tournament.py --agents random alphabeta:5 --boards 6x4 6x5 --games 100 --output results.jsonl
+"""
+import argparse
+import csv
+import importlib
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from book import OpeningBook
+from main import (AIPlayer, MoveOrdering, TranspositionTable, WeightedEvaluation, alpha_beta_cutoff_search,
+                  iterative_deepening_search, minmax_decision)
+from mcts import MCTS
+from records import encode_moves
+
+
+_books = {} # (pits, stones) -> OpeningBook or None, loaded once per process
+
+
+def opening_book(game):
+    """The opening book for game's board size (see book.py), or None if there is none."""
+    key = (game.pits_per_player, game.stones_per_pit)
+    if key not in _books:
+        _books[key] = OpeningBook.find(*key)
+    return _books[key]
+
+
+class RandomAgent:
+    def new_game(self, game, rng):
+        self.rng = rng
+
+    def move(self, game, state):
+        return self.rng.choice(game.actions(state))
+
+
+class MinimaxAgent:
+    def __init__(self, depth):
+        self.depth = depth
+
+    def new_game(self, game, rng):
+        pass
+
+    def move(self, game, state):
+        return minmax_decision(state, game, self.depth)
+
+
+class AlphaBetaAgent:
+    def __init__(self, depth):
+        self.depth = depth
+
+    def new_game(self, game, rng):
+        self.table = TranspositionTable()
+        self.book = opening_book(game)
+
+    def move(self, game, state):
+        return alpha_beta_cutoff_search(state, game, self.depth, None, None, self.table, book=self.book)
+
+
+class IterativeDeepeningAgent:
+    def __init__(self, time_limit):
+        self.time_limit = time_limit
+
+    def new_game(self, game, rng):
+        self.table = TranspositionTable()
+        self.ordering = MoveOrdering(game)
+        self.book = opening_book(game)
+
+    def move(self, game, state):
+        return iterative_deepening_search(state, game, self.time_limit, table=self.table, ordering=self.ordering, book=self.book)
+
+
+class EvaluationAgent:
+    """Alpha-beta with WeightedEvaluation instead of the plain mancala difference."""
+    def __init__(self, arg):
+        depth, _, path = arg.partition(':')
+        self.depth = int(depth)
+        self.weights = WeightedEvaluation.load_weights(path) if path else None
+
+    def new_game(self, game, rng):
+        self.table = TranspositionTable()
+        self.evaluations = {player: WeightedEvaluation(game, player, self.weights) for player in (1, 2)}
+
+    def move(self, game, state):
+        return alpha_beta_cutoff_search(state, game, self.depth, None, self.evaluations[game.to_move(state)], self.table)
+
+
+class MCTSAgent:
+    def __init__(self, arg):
+        self.iterations = None if arg.endswith('ms') else int(arg)
+        self.time_limit = int(arg[:-2]) if arg.endswith('ms') else None
+
+    def new_game(self, game, rng):
+        self.mcts = MCTS(game, self.iterations, self.time_limit, seed=rng.random())
+
+    def move(self, game, state):
+        return self.mcts.search(state)
+
+
+AGENTS = {
+    'random': lambda arg: RandomAgent(),
+    'minimax': lambda arg: MinimaxAgent(int(arg)),
+    'alphabeta': lambda arg: AlphaBetaAgent(int(arg)),
+    'id': lambda arg: IterativeDeepeningAgent(int(arg)),
+    'eval': EvaluationAgent,
+    'mcts': MCTSAgent,
+}
+
+
+def make_agent(spec):
+    name, _, arg = spec.partition(':')
+    if name in AGENTS:
+        return AGENTS[name](arg)
+    module, _, function = spec.rpartition(':') # custom agent, module:function
+    return getattr(importlib.import_module(module), function)()
+
+
+def game_key(agent1, agent2, pits, stones, seed, opening_plies):
+    return f"{agent1}|{agent2}|{pits}x{stones}|{seed}|{opening_plies}"
+
+
+def play_game(job):
+    """Plays one game, after opening_plies random moves drawn from seed, and returns its result record."""
+    agent1, agent2, pits, stones, seed, opening_plies = job
+    rng = random.Random(seed)
+    game = AIPlayer(pits, stones)
+    state = game.getState()
+    opening = []
+    while len(opening) < opening_plies and not game.terminal_test(state):
+        opening.append(rng.choice(game.actions(state)))
+        state = game.result(state, opening[-1])
+    agents = {1: make_agent(agent1), 2: make_agent(agent2)}
+    for agent in agents.values():
+        agent.new_game(game, rng)
+    move_time = {1: 0.0, 2: 0.0}
+    move_count = {1: 0, 2: 0}
+    while not game.terminal_test(state):
+        player = game.to_move(state)
+        start = time.perf_counter()
+        pit = agents[player].move(game, state)
+        move_time[player] += time.perf_counter() - start
+        move_count[player] += 1
+        state = game.result(state, pit)
+    p1 = state[game.p1_mancala_index]
+    p2 = state[game.p2_mancala_index]
+    return {'key': game_key(agent1, agent2, pits, stones, seed, opening_plies), 'agent1': agent1, 'agent2': agent2,
+            'pits': pits, 'stones': stones, 'seed': seed, 'opening': encode_moves(opening),
+            'winner': 1 if p1 > p2 else 2 if p2 > p1 else 0, 'p1_score': p1, 'p2_score': p2,
+            'turns': len(opening) + move_count[1] + move_count[2],
+            'p1_moves': move_count[1], 'p1_time': move_time[1], 'p2_moves': move_count[2], 'p2_time': move_time[2]}
+
+
+FIELDS = ['key', 'agent1', 'agent2', 'pits', 'stones', 'seed', 'opening', 'winner', 'p1_score', 'p2_score', 'turns',
+          'p1_moves', 'p1_time', 'p2_moves', 'p2_time']
+INT_FIELDS = {'pits', 'stones', 'seed', 'winner', 'p1_score', 'p2_score', 'turns', 'p1_moves', 'p2_moves'}
+
+
+def read_results(path):
+    """Results already written to path, so an interrupted run can be resumed. A last line that a
+    killed run left unfinished is cut off the file, so new results start on a line of their own."""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        lines = data[:end].decode().splitlines()
+        if lines and not path.endswith('.csv'):
+            try:
+                json.loads(lines[-1])
+            except ValueError: # a garbled last row is dropped too
+                end = data.rfind(b'\n', 0, end - 1) + 1
+                lines.pop()
+        if end < len(data):
+            f.truncate(end)
+    if path.endswith('.csv'):
+        return [{k: int(v) if k in INT_FIELDS else float(v) if k.endswith('_time') else v for k, v in row.items()}
+                for row in csv.DictReader(lines)]
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def wilson_interval(wins, games, z=1.96):
+    """95% Wilson score interval for a win rate."""
+    if games == 0:
+        return 0.0, 0.0
+    rate = wins / games
+    center = (rate + z * z / (2 * games)) / (1 + z * z / games)
+    margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / (1 + z * z / games)
+    return max(center - margin, 0.0), min(center + margin, 1.0)
+
+
+def summarize(results):
+    matchups = {}
+    for r in results:
+        matchups.setdefault((r['agent1'], r['agent2'], r['pits'], r['stones']), []).append(r)
+    for (agent1, agent2, pits, stones), games in sorted(matchups.items()):
+        n = len(games)
+        wins1 = sum(r['winner'] == 1 for r in games)
+        wins2 = sum(r['winner'] == 2 for r in games)
+        low, high = wilson_interval(wins1, n)
+        ms1 = 1000 * sum(r['p1_time'] for r in games) / max(sum(r['p1_moves'] for r in games), 1)
+        ms2 = 1000 * sum(r['p2_time'] for r in games) / max(sum(r['p2_moves'] for r in games), 1)
+        print(f"{agent1} (P1) vs {agent2} (P2) on {pits}x{stones}: {n} games")
+        print(f"  P1 wins {wins1} ({wins1 / n:.1%}, 95% CI {low:.1%}-{high:.1%}), P2 wins {wins2}, ties {n - wins1 - wins2}")
+        print(f"  average time per move: P1 {ms1:.2f} ms, P2 {ms2:.2f} ms, average turns {sum(r['turns'] for r in games) / n:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mancala tournament runner")
+    parser.add_argument("--agents", nargs='+', default=['random', 'alphabeta:5'])
+    parser.add_argument("--boards", nargs='+', default=['6x4'], help="pits_per_player x stones_per_pit")
+    parser.add_argument("--games", type=int, default=100, help="games per pairing and board")
+    parser.add_argument("--seed", type=int, default=0, help="game g uses seed + g")
+    parser.add_argument("--opening-plies", type=int, default=4, help="random moves from the game's seed before the agents play")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--output", default="results.jsonl")
+    args = parser.parse_args()
+
+    pairings = [(a, b) for i, a in enumerate(args.agents) for j, b in enumerate(args.agents) if i != j] or [(args.agents[0], args.agents[0])]
+    pairings = list(dict.fromkeys(pairings))
+    boards = [tuple(int(x) for x in board.split('x')) for board in args.boards]
+    jobs = [(a, b, pits, stones, args.seed + g, args.opening_plies) for a, b in pairings for pits, stones in boards for g in range(args.games)]
+
+    results = read_results(args.output)
+    done = {r['key'] for r in results}
+    jobs = [job for job in jobs if game_key(*job) not in done]
+    print(f"{len(done)} games already in {args.output}, playing {len(jobs)} more")
+
+    if jobs:
+        is_csv = args.output.endswith('.csv')
+        new_file = not os.path.exists(args.output) or os.path.getsize(args.output) == 0
+        with open(args.output, 'a', newline='') as f, multiprocessing.Pool(args.workers) as pool:
+            writer = csv.DictWriter(f, FIELDS) if is_csv else None
+            if writer and new_file:
+                writer.writeheader()
+            for result in pool.imap_unordered(play_game, jobs):
+                if writer:
+                    writer.writerow(result)
+                else:
+                    f.write(json.dumps(result) + "\n")
+                f.flush()
+                results.append(result)
+
+    summarize(results)
+
+
+if __name__ == "__main__":
+    main()
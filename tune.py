@@ -0,0 +1,112 @@
+"""
+Offline tuner for the WeightedEvaluation weights.
+
+Plays self-play games on a process pool (alpha-beta at --depth with the plain mancala difference,
+and a share of random moves so the positions vary), records the evaluation features of every
+position together with the final result, and fits the weights by logistic regression: the
+probability that player 1 wins is modelled as sigmoid(weights . features). The weights are then
+scaled so the store weight is 1, which keeps evaluations in stones, and written as JSON.
+Every fifth game is held out of the fit; the log loss on its positions is printed for the fitted
+weights and for the store difference alone, both fitted on the same training games.
+
+Use the result with WeightedEvaluation(game, player, WeightedEvaluation.load_weights(path)),
+or in tournament.py as eval:K:path.
+
+Usage: python tune.py --games 2000 --pits 6 --stones 4 --output weights_6x4.json
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import time
+import numpy as np
+from main import FEATURES, AIPlayer, TranspositionTable, WeightedEvaluation, alpha_beta_cutoff_search
+
+
+def self_play(job):
+    """Plays one game and returns (features of every position, 1 / 0.5 / 0 for a player 1 win / tie / loss)."""
+    seed, pits, stones, depth, randomness = job
+    rng = random.Random(seed)
+    game = AIPlayer(pits, stones)
+    evaluation = WeightedEvaluation(game, 1)
+    tables = {1: TranspositionTable(), 2: TranspositionTable()}
+    state = game.getState()
+    positions = []
+    while not game.terminal_test(state):
+        positions.append(evaluation.features(state))
+        if rng.random() < randomness:
+            move = rng.choice(game.actions(state))
+        else:
+            move = alpha_beta_cutoff_search(state, game, depth, None, None, tables[game.to_move(state)])
+        state = game.result(state, move)
+    diff = game.utility(state, 1)
+    return positions, 1.0 if diff > 0 else 0.0 if diff < 0 else 0.5
+
+
+def log_loss(w, features, results):
+    """Mean log loss of the weights w on the positions features with results."""
+    x = np.asarray(features, dtype=float)
+    y = np.asarray(results, dtype=float)
+    p = np.clip(1 / (1 + np.exp(-x @ w)), 1e-9, 1 - 1e-9)
+    return -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))
+
+
+def fit(features, results, epochs=2000, learning_rate=0.1, l2=1e-4):
+    """Logistic regression by gradient descent; features are standardized while fitting.
+    Returns the weights and their log loss on the training positions."""
+    x = np.asarray(features, dtype=float)
+    y = np.asarray(results, dtype=float)
+    scale = x.std(axis=0)
+    scale[scale == 0] = 1.0
+    xs = x / scale
+    w = np.zeros(x.shape[1])
+    for _ in range(epochs):
+        p = 1 / (1 + np.exp(-xs @ w))
+        w -= learning_rate * (xs.T @ (p - y) / len(y) + l2 * w)
+    w = w / scale
+    return w, log_loss(w, x, y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit WeightedEvaluation weights from self-play")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--pits", type=int, default=6)
+    parser.add_argument("--stones", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=2, help="search depth of the self-play players")
+    parser.add_argument("--randomness", type=float, default=0.2, help="share of random moves in self-play")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--output", default=None, help="defaults to weights_<pits>x<stones>.json")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    jobs = [(args.seed + g, args.pits, args.stones, args.depth, args.randomness) for g in range(args.games)]
+    # Hold out every fifth game to check the fit: positions of one game share its result, so
+    # splitting by position would put near copies of the held out positions in the training set
+    sets = {'train': ([], []), 'test': ([], [])}
+    with multiprocessing.Pool(args.workers) as pool:
+        for g, (positions, result) in enumerate(pool.imap(self_play, jobs, chunksize=16)):
+            features, results = sets['test' if g % 5 == 0 else 'train']
+            features.extend(positions)
+            results.extend([result] * len(positions))
+    train_x, train_y = sets['train']
+    test_x, test_y = sets['test']
+    print(f"{args.games} games, {len(train_x) + len(test_x)} positions in {time.perf_counter() - start:.1f}s")
+
+    # The baseline evaluation is the store difference alone, fitted on the same training games
+    w, train_loss = fit(train_x, train_y)
+    baseline_w, baseline_train_loss = fit([(f[0],) for f in train_x], train_y)
+    test_loss = log_loss(w, test_x, test_y)
+    baseline_test_loss = log_loss(baseline_w, [(f[0],) for f in test_x], test_y)
+    print(f"log loss on {len(test_x)} held out positions: weights {test_loss:.4f}, store difference only {baseline_test_loss:.4f} "
+          f"(training: {train_loss:.4f}, {baseline_train_loss:.4f})")
+
+    weights = {name: round(float(value / w[0]), 4) for name, value in zip(FEATURES, w)}
+    path = args.output or f"weights_{args.pits}x{args.stones}.json"
+    with open(path, 'w') as f:
+        json.dump(weights, f, indent=2)
+    print(f"weights {weights} written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Tk user interface for Mancala: player vs player, vs random and vs the AI.
+
+Kept apart from main.py so that the engine and the searches can be imported without tkinter
+(headless hosts, worker processes); python main.py opens this UI unless --cli is given.
+"""
+import queue
+import threading
+from tkinter import *
+import tkinter as tk
+from tkinter import messagebox
+from book import OpeningBook
+from endgame import EndgameDatabase
+from main import AI_POLL_INTERVAL, AI_TIME_LIMIT, MoveOrdering, TranspositionTable, iterative_deepening_search
+
+
+class MancalaUI:
+    def __init__(self, Mancala):
+        self.game = Mancala
+        self.table = TranspositionTable() #Reused by every AI move of this game
+        self.ordering = MoveOrdering(self.game)
+        self.endgame = EndgameDatabase.find(self.game.pits_per_player) #Exact values near the end of the game, None without a database
+        self.book = OpeningBook.find(self.game.pits_per_player, self.game.stones_per_pit) #Instant opening moves, None without a book
+        self.searching = False #True while the AI thinks on a background thread
+        self.root = tk.Tk()
+        self.root.title("Mancala Game")
+        self.menu()
+    def menu(self):
+        buttonFrame = tk.Frame(self.root)
+        buttonFrame.pack(pady=100)
+        title = tk.Label(self.root, text="Make a Selection!", font = ("Arial", 24, "bold"))
+        title.pack(pady=20)
+        button0 = Button(self.root, text="Player vs Player", command=self.player_vs_player, width = 20, height = 2)
+        button1 = Button(self.root, text="Player vs AI", command=self.player_vs_ai, width = 20, height = 2)
+        button2 = Button(self.root, text="Player vs Random Player", command=self.player_vs_random, width = 20, height = 2)
+        button0.pack()
+        button1.pack()
+        button2.pack()
+
+    def setup_board(self, func):
+        for widget in self.root.winfo_children(): #Clears the initial buttons
+            widget.destroy()
+        self.player = tk.Label(self.root, text=f"Player {self.game.current_player}'s Turn") #Keeps track of current player
+        self.player.pack(pady=10)
+        self.moveLabel = tk.Label(self.root, text="Last Move: None") #Used for AI and Random Player
+        self.moveLabel.pack(pady=5)
+        board_frame = tk.Frame(self.root) 
+        board_frame.pack(pady=20) #Y-axis positioning
+        self.p2_mancala_label = tk.Label(board_frame, text=f"P2-{self.game.board[self.game.p2_mancala_index]}", width=5, height=6, bg="white", fg="black") #P2 Mancala
+        self.p2_mancala_label.grid(row=0, column=0, rowspan=2, padx=10, pady=10)
+        self.p2Buttons = [] #Stores buttons n an array so they can be updated by update_board
+        for i in range(self.game.pits_per_player):
+            index = self.game.p2_pits_index[0] + i
+            stones = self.game.board[index]
+            btn = tk.Button(board_frame, text=f"P2-{stones}", width=5, height=2, command=lambda pit=(self.game.pits_per_player - i): func(pit), state=tk.NORMAL if self.game.current_player == 2 else tk.DISABLED)
+            btn.grid(row=0, column=i+1)
+            self.p2Buttons.append(btn) #Creates the buttons 
+        self.p1Buttons = []
+        for i in range(self.game.pits_per_player):
+            index = self.game.p1_pits_index[0] + i
+            stones = self.game.board[index]
+            btn=tk.Button(board_frame, text=f"P1-{stones}", width=5, height=2, command=lambda pit = i+1: func(pit), state=tk.NORMAL if self.game.current_player == 1 else tk.DISABLED)
+            btn.grid(row=1, column=i+1)
+            self.p1Buttons.append(btn)
+        self.p1_mancala_label = tk.Label(board_frame, text=f"P1-{self.game.board[self.game.p1_mancala_index]}", width=5, height=6, bg="white", fg="black") #P2 Mancala
+        self.p1_mancala_label.grid(row=0, column=self.game.pits_per_player+1, rowspan=2, padx=10, pady=10)
+        quit = tk.Button(self.root, text="Quit", command=self.root.quit)
+        quit.pack(pady=1)
+
+    def play_turn(self, pit):
+        if self.game.valid_move(pit):
+            self.game.play_turn(pit)
+            if self.game.is_game_over(): #Logic check
+                self.game_over()
+            else:
+                self.moveLabel.pack_forget() #Hides label because we do not need it is not needed
+                self.update_board()
+        else:
+            tk.messagebox.showerror("Invalid Move", "Please select a valid pit.")
+
+    def game_over(self):
+        self.game.winning_eval() #Tells the observers, e.g. a GameRecorder
+        tk.messagebox.showinfo("Game Over", f"Game Over! {self.game.game_result()}")
+        self.root.quit()
+
+    def update_board(self):
+        p1Start = self.game.p1_pits_index[0] 
+        for i, btn in enumerate(self.p1Buttons): #Returns both index and btn so we can update both dynamical
+            stones = self.game.board[p1Start + i] #Updates player 1's buttons
+            btn.config(text=f"P1-{stones}")
+            btn.config(state=tk.NORMAL if self.game.current_player == 1 else tk.DISABLED) #Disables buttons hen it is not player turn
+        p2End = self.game.p2_pits_index[1]
+        for i, btn in enumerate(self.p2Buttons): #Same thing done here as above but with player 2 index logic
+            stones = self.game.board[p2End - i]
+            btn.config(text=f"P2-{stones}") 
+            btn.config(state=tk.NORMAL if self.game.current_player == 2 else tk.DISABLED)
+        self.p1_mancala_label.config(text=f"P1-{self.game.board[self.game.p1_mancala_index]}") #Updates mancala index
+        self.p2_mancala_label.config(text=f"P2-{self.game.board[self.game.p2_mancala_index]}")
+        self.player.config(text=f"Player {self.game.current_player}'s Turn") #Updates turn
+        self.game.display_board()
+
+    def play_turn_random(self, pit):
+        if self.game.valid_move(pit):
+            self.game.play_turn(pit) #Logic check
+            if self.game.is_game_over():
+                self.game_over()
+            else:
+                if self.game.current_player == 2:
+                    pit = self.game.random_move_generator() #Random move logic
+                    self.moveLabel.config(text=f"Last Move Player {self.game.current_player} moved pit {self.game.pits_per_player - pit+1}") #Helps keep track
+                    self.game.play_turn(pit)
+                    self.update_board()
+        else:
+            tk.messagebox.showerror("Invalid Move", "Please select a valid pit.")
+ 
+    def play_turn_ai(self, pit):
+        if self.searching:
+            return
+        if self.game.valid_move(pit):
+            self.game.play_turn(pit)
+            if self.game.is_game_over(): #Logic check
+                self.game_over()
+            else:
+                self.update_board()
+                if self.game.current_player == 2:
+                    self.start_ai_search()
+        else:
+            tk.messagebox.showerror("Invalid Move", "Please select a valid pit.")
+
+    def start_ai_search(self):
+        """Runs the AI search on a background thread so the window keeps responding; poll_ai picks up the move."""
+        self.searching = True
+        for btn in self.p1Buttons + self.p2Buttons:
+            btn.config(state=tk.DISABLED)
+        self.thinkingLabel.config(text="AI is thinking")
+        self.thinkingLabel.pack(pady=5)
+        self.moveNowButton.config(state=tk.NORMAL)
+        self.moveNowButton.pack(pady=5)
+        self.stop = threading.Event()
+        self.results = queue.Queue()
+        state = self.game.getState()
+
+        def search():
+            action = iterative_deepening_search(state, self.game, AI_TIME_LIMIT, table=self.table, ordering=self.ordering, endgame=self.endgame,
+                                                stop=self.stop, pvs=True, book=self.book) #AI logic, searches as deep as the time limit allows
+            self.results.put(action)
+        threading.Thread(target=search, daemon=True).start()
+        self.root.after(AI_POLL_INTERVAL, self.poll_ai)
+
+    def poll_ai(self):
+        try:
+            action = self.results.get_nowait()
+        except queue.Empty:
+            dots = (self.thinkingLabel.cget("text").count(".") + 1) % 4
+            self.thinkingLabel.config(text="AI is thinking" + "." * dots)
+            self.root.after(AI_POLL_INTERVAL, self.poll_ai)
+            return
+        self.searching = False
+        self.thinkingLabel.pack_forget()
+        self.moveNowButton.pack_forget()
+        self.moveLabel.config(text=f"Last Move Player {self.game.current_player} moved pit {self.game.pits_per_player - action+1}")
+        self.game.play_turn(action)
+        if self.game.is_game_over():
+            self.game_over()
+        else:
+            self.update_board()
+
+    def move_now(self):
+        """Stops the search; the AI plays the best move of its deepest finished iteration."""
+        self.stop.set()
+        self.moveNowButton.config(state=tk.DISABLED)
+
+    def player_vs_random(self): # Working
+        self.setup_board(self.play_turn_random)
+    def player_vs_ai(self): # Working
+        self.setup_board(self.play_turn_ai)
+        self.thinkingLabel = tk.Label(self.root, text="AI is thinking") #Only shown while the AI searches
+        self.moveNowButton = tk.Button(self.root, text="Move Now", command=self.move_now)
+    def player_vs_player(self): # Working
+        self.setup_board(self.play_turn)
+    def run(self):
+        self.root.mainloop()